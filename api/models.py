@@ -1,7 +1,7 @@
 """
 Pydantic models for API requests and responses.
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel
 import time
 
@@ -16,6 +16,14 @@ class MakeMoveRequest(BaseModel):
     to_pos: List[int]
     promotion: Optional[PromotionData] = None
 
+    @property
+    def promo(self) -> Tuple[Optional[str], Optional[str]]:
+        """Promotion (type, piece) pair, or (None, None) for a plain move"""
+        promotion = self.promotion
+        if promotion is None:
+            return (None, None)
+        return (promotion.type, promotion.piece)
+
 
 class CreateSessionRequest(BaseModel):
     mode: str = 'human_vs_ai'
@@ -1,9 +1,11 @@
 """
 WebSocket endpoint handlers for real-time multiplayer.
 """
+import asyncio
 import time
 from fastapi import WebSocket, WebSocketDisconnect
 from models.chess_board import Color, GameMode
+from multiplayer.features import dumps_message
 
 
 async def handle_websocket_connection(websocket: WebSocket, session_id: str,
@@ -27,7 +29,7 @@ async def handle_websocket_connection(websocket: WebSocket, session_id: str,
             "type": "game_state",
             "data": session.get_game_state()
         }
-        await websocket.send_json(game_state)
+        await websocket.send_bytes(dumps_message(game_state))
         
         # Listen for messages
         while True:
@@ -77,11 +79,16 @@ async def handle_make_move(session, message: dict, websocket: WebSocket, websock
     
     if from_pos and to_pos:
         try:
-            success = session.make_move(
-                from_pos[0], from_pos[1], to_pos[0], to_pos[1],
-                promotion.get("type") if promotion else None,
-                promotion.get("piece") if promotion else None
-            )
+            async with session.lock:
+                success = await asyncio.to_thread(
+                    session.make_move,
+                    from_pos[0], from_pos[1], to_pos[0], to_pos[1],
+                    promotion.get("type") if promotion else None,
+                    promotion.get("piece") if promotion else None
+                )
+                if success:
+                    # Let the AI start thinking about its reply straight away
+                    await session.start_ai_precompute()
             
             if success:
                 # Broadcast update to all connected players
@@ -95,52 +102,56 @@ async def handle_make_move(session, message: dict, websocket: WebSocket, websock
                         "game_state": session.get_game_state()
                     }
                 }
-                await websocket_manager.broadcast_to_session(session.session_id, update_message)
+                websocket_manager.enqueue(session.session_id, update_message)
             else:
                 error_message = {
                     "type": "error",
                     "data": {"message": "Invalid move"}
                 }
-                await websocket.send_json(error_message)
+                await websocket.send_bytes(dumps_message(error_message))
                 
         except Exception as e:
             error_message = {
                 "type": "error",
                 "data": {"message": str(e)}
             }
-            await websocket.send_json(error_message)
+            await websocket.send_bytes(dumps_message(error_message))
 
 
 async def handle_ai_move_request(session, websocket: WebSocket, websocket_manager):
     """Handle AI move request via WebSocket"""
     if session.mode == GameMode.HUMAN_VS_AI:
         try:
-            ai_move = session.get_ai_move()
-            if ai_move:
-                # Make the AI move
-                success = session.make_move(
-                    ai_move['from'][0], ai_move['from'][1],
-                    ai_move['to'][0], ai_move['to'][1],
-                    ai_move.get('promotion')
-                )
-                
-                if success:
-                    update_message = {
-                        "type": "ai_move_made",
-                        "data": {
-                            "move": ai_move,
-                            "success": True,
-                            "game_state": session.get_game_state()
-                        }
+            async with session.lock:
+                # Reuses the precomputed search when there is one
+                ai_move = await session.next_ai_move()
+                success = False
+                if ai_move:
+                    # Make the AI move, validated in a worker thread
+                    success = await asyncio.to_thread(
+                        session.make_move,
+                        ai_move['from'][0], ai_move['from'][1],
+                        ai_move['to'][0], ai_move['to'][1],
+                        ai_move.get('promotion')
+                    )
+            
+            if success:
+                update_message = {
+                    "type": "ai_move_made",
+                    "data": {
+                        "move": ai_move,
+                        "success": True,
+                        "game_state": session.get_game_state()
                     }
-                    await websocket_manager.broadcast_to_session(session.session_id, update_message)
+                }
+                await websocket_manager.broadcast_to_session(session.session_id, update_message)
                 
         except Exception as e:
             error_message = {
                 "type": "error",
                 "data": {"message": f"AI move error: {str(e)}"}
             }
-            await websocket.send_json(error_message)
+            await websocket.send_bytes(dumps_message(error_message))
 
 
 async def handle_chat_message(session_id: str, message: dict, websocket_manager):
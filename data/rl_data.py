@@ -5,7 +5,7 @@ import sqlite3
 import time
 import uuid
 from threading import Lock
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 class GameDataRecorder:
@@ -194,6 +194,31 @@ class GameDataRecorder:
                 
                 return games
     
+    def get_games_since(self, last_id: int, limit: int = 100) -> Tuple[List[Dict], int]:
+        """Finished games recorded after row last_id, oldest first
+        
+        At most the newest limit games are returned, along with the row id to
+        pass as last_id next time.
+        """
+        with self.data_lock:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT id, result, final_position
+                    FROM games 
+                    WHERE id > ? AND end_time IS NOT NULL
+                    ORDER BY id DESC 
+                    LIMIT ?
+                ''', (last_id, limit))
+                
+                rows = cursor.fetchall()
+                games = [
+                    {'result': row[1], 'final_position': row[2]}
+                    for row in reversed(rows)
+                ]
+                
+                return games, (rows[0][0] if rows else last_id)
+    
     def get_statistics(self) -> Dict:
         """Get database statistics"""
         with self.data_lock:
@@ -256,28 +281,42 @@ class GameDataRecorder:
     
     def record_game(self, board_state: dict, move_sequence: list, player_won: bool, game_result: str):
         """Record a completed game for RL training"""
+        self.record_many([{
+            'board_state': board_state,
+            'move_sequence': move_sequence,
+            'player_won': player_won,
+            'game_result': game_result
+        }])
+    
+    def record_many(self, games: List[Dict]):
+        """Record several completed games (record_game's arguments as dicts) in one transaction"""
         try:
             with self.data_lock:
                 with sqlite3.connect(self.db_path) as conn:
                     cursor = conn.cursor()
                     
-                    # Insert game record
-                    game_id = str(uuid.uuid4())
-                    cursor.execute('''
+                    # Insert game records
+                    now = time.time()
+                    rows = []
+                    for game in games:
+                        game_id = str(uuid.uuid4())
+                        rows.append((
+                            game_id, 
+                            game_id,  # Use game_id as session_id for now
+                            'human_vs_ai',
+                            now - 300,  # Approximate start time
+                            now,
+                            game['game_result'],
+                            str(game['board_state']),
+                            len(game['move_sequence'])
+                        ))
+                    cursor.executemany('''
                         INSERT INTO games (game_id, session_id, game_mode, start_time, end_time, result, final_position, total_moves)
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        game_id, 
-                        game_id,  # Use game_id as session_id for now
-                        'human_vs_ai',
-                        time.time() - 300,  # Approximate start time
-                        time.time(),
-                        game_result,
-                        str(board_state),
-                        len(move_sequence)
-                    ))
+                    ''', rows)
                     
-                    print(f"📊 Recorded RL game data: {game_result}")
+                    for game in games:
+                        print(f"📊 Recorded RL game data: {game['game_result']}")
                     
         except Exception as e:
             print(f"❌ Error recording game: {e}")
@@ -2,31 +2,87 @@
 Monte Carlo Tree Search implementation for chess.
 """
 import math
+import multiprocessing
 import random
+import threading
 import time
-from typing import List, Optional, Tuple
-from models.chess_board import ChessBoard, Color, GameResult
-from models.evaluator import ChessEvaluator
+from bisect import bisect
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import accumulate
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence, Tuple
+from models.chess_board import BLACK, COLOR_INDEX, ChessBoard, Color, GameResult
+from models.evaluator import CAPTURE_VALUES, CENTER_MASK, ChessEvaluator
+
+# Maximum number of positions kept in a ChessMCTS transposition table
+TT_SIZE = 1 << 20
+
+# sqrt(log(n)) for the parent visit counts UCB1 sees in practice
+SQRT_LOG_SIZE = 1 << 17
+SQRT_LOG = (0.0,) + tuple(math.sqrt(math.log(n)) for n in range(1, SQRT_LOG_SIZE))
+
+# Visits a thread adds along the path it is simulating in a shared tree, so
+# the other threads' descents are steered towards different lines
+VIRTUAL_LOSS = 3
+
+# Scale applied to the visit and win counts a search continues from a
+# previous search's tree, so fresh results soon outweigh the old ones
+TREE_DECAY = 0.8
+
+
+def pool_context():
+    """Multiprocessing context for every worker pool searches use
+    
+    Workers come from a forkserver (or are spawned) rather than forked from
+    the caller, whose threads could leave a child holding a lock taken
+    mid-fork.  The forkserver loads this module once, so its workers start
+    with the engine already imported.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['engines.mcts'])
+        return context
+    return multiprocessing.get_context('spawn')
 
 
 class MCTSNode:
     """Node in the Monte Carlo Tree Search"""
     
-    def __init__(self, board: ChessBoard, move=None, parent=None):
+    # Thousands of nodes are built per search; slots keep them small
+    __slots__ = ('board', 'move', 'parent', 'move_player', 'children', 'visits', 'wins',
+                 'virtual_loss', 'incomplete', '_inv_sqrt_visits', 'legal_moves',
+                 'untried_moves')
+    
+    def __init__(self, board: ChessBoard, move=None, parent=None, untried_moves=None,
+                 legal_moves=None):
         self.board = board
         self.move = move  # The move that led to this position
         self.parent = parent
+        # Side that played move as WHITE / BLACK (None at the root), the
+        # side a win is credited to
+        if move is None:
+            self.move_player = None
+        else:
+            self.move_player = BLACK - COLOR_INDEX[board.current_player]
         self.children = []
         self.visits = 0
         self.wins = 0
-        self.untried_moves = board.get_all_legal_moves()
+        # Visits added by in-flight simulations through this node, not yet backed up
+        self.virtual_loss = 0
+        # Rollouts through this node started but not yet finished (WU-UCT)
+        self.incomplete = 0
+        # 1 / sqrt(visits + incomplete), refreshed whenever either changes
+        self._inv_sqrt_visits = 0.0
+        # Generated once per node; selection tests it for terminal positions
+        self.legal_moves = legal_moves if legal_moves is not None else board.get_all_legal_moves()
         
-        # Sort moves by priority for better move ordering
-        self.evaluator = ChessEvaluator()
-        self.untried_moves.sort(
-            key=lambda m: self.evaluator.get_move_priority(board, m), 
-            reverse=True
-        )
+        # Lowest priority first, so expansion pops the best move off the end
+        if untried_moves is not None:
+            # Already ordered by the caller (e.g. from a transposition table)
+            self.untried_moves = untried_moves
+        else:
+            # Sort moves by priority for better move ordering
+            self.untried_moves = ChessEvaluator().order_moves(board, self.legal_moves)[::-1]
     
     def is_fully_expanded(self) -> bool:
         """Check if all moves have been tried"""
@@ -34,19 +90,53 @@ class MCTSNode:
     
     def is_terminal(self) -> bool:
         """Check if this is a terminal node"""
-        return (self.board.is_checkmate() or 
-                self.board.is_stalemate() or 
-                len(self.board.get_all_legal_moves()) == 0)
+        # Checkmate and stalemate are exactly the positions with no legal move
+        return not self.legal_moves
     
     def ucb1_value(self, c: float = 1.4) -> float:
         """Calculate UCB1 value for node selection"""
         if self.visits == 0:
-            return float('inf')
-        return (self.wins / self.visits) + c * math.sqrt(math.log(self.parent.visits) / self.visits)
+            # Unexplored, unless a rollout from here is still pending
+            if not self.incomplete:
+                return math.inf
+            exploitation = 0.0
+        else:
+            exploitation = self.wins / self.visits
+        # Pending rollouts count as visits in the exploration term only
+        parent_visits = self.parent.visits + self.parent.incomplete
+        if parent_visits < SQRT_LOG_SIZE:
+            sqrt_log = SQRT_LOG[parent_visits]
+        else:
+            sqrt_log = math.sqrt(math.log(parent_visits))
+        return exploitation + c * sqrt_log * self._inv_sqrt_visits
     
-    def best_child(self) -> 'MCTSNode':
-        """Get the child with the best UCB1 value"""
-        return max(self.children, key=lambda child: child.ucb1_value())
+    def best_child(self, c: float = 1.4) -> 'MCTSNode':
+        """Get the child with the best UCB1 value
+        
+        Same choice as max over ucb1_value, but the parent's exploration
+        factor is worked out once for all children instead of per child.
+        """
+        parent_visits = self.visits + self.incomplete
+        if parent_visits < SQRT_LOG_SIZE:
+            c_sqrt_log = c * SQRT_LOG[parent_visits]
+        else:
+            c_sqrt_log = c * math.sqrt(math.log(parent_visits))
+        
+        best = None
+        best_value = -math.inf
+        for child in self.children:
+            visits = child.visits
+            if visits:
+                value = child.wins / visits + c_sqrt_log * child._inv_sqrt_visits
+            elif child.incomplete:
+                value = c_sqrt_log * child._inv_sqrt_visits
+            else:
+                # Unexplored: infinite UCB1, and the first such child wins ties
+                return child
+            if value > best_value:
+                best = child
+                best_value = value
+        return best
     
     def most_visited_child(self) -> 'MCTSNode':
         """Get the most visited child"""
@@ -56,71 +146,362 @@ class MCTSNode:
 class ChessMCTS:
     """Monte Carlo Tree Search for chess"""
     
-    def __init__(self, time_limit: float = 6.0, max_simulations: int = 3000, max_depth: int = 40):
+    def __init__(self, time_limit: float = 6.0, max_simulations: int = 3000, max_depth: int = 40,
+                 n_threads: int = 1, n_processes: int = 1, leaf_rollouts: int = 1,
+                 tree_parallel: bool = False, concurrency: int = 1):
         self.time_limit = time_limit
         self.max_simulations = max_simulations
         self.max_depth = max_depth
+        # Independent search trees grown in parallel and merged at the root,
+        # either in threads or (to get past the GIL) in worker processes
+        self.n_threads = max(1, n_threads)
+        self.n_processes = max(1, n_processes)
+        # With tree_parallel the threads share a single tree instead, kept
+        # apart by virtual loss
+        self.tree_parallel = tree_parallel
+        # Rollouts played from each new leaf, in a process pool when above 1
+        self.leaf_rollouts = max(1, leaf_rollouts)
+        # Rollouts kept in flight in the process pool at once, with
+        # WU-UCT statistics steering selection around the pending ones
+        self.concurrency = max(1, concurrency)
+        self._sim_pool = None
+        # Worker processes for root-parallel searches (n_processes > 1)
+        self._search_pool = None
         self.simulation_depth_limit = 80
         self.evaluator = ChessEvaluator()
+        # Zobrist key -> per-position data (legal moves, ordered moves,
+        # static evaluation) reused across transpositions and searches
+        self.tt = {}
+    
+    def _tt_entry(self, board: ChessBoard) -> dict:
+        """Get the transposition table entry for a position, creating it if needed"""
+        entry = self.tt.get(board.zobrist)
+        if entry is None:
+            if len(self.tt) >= TT_SIZE:
+                self.tt.clear()
+            entry = {'moves': board.get_all_legal_moves()}
+            self.tt[board.zobrist] = entry
+        return entry
+    
+    def _ordered_moves(self, board: ChessBoard) -> List[Tuple]:
+        """Legal moves sorted by priority, lowest first (a fresh list)"""
+        entry = self._tt_entry(board)
+        ordered = entry.get('ordered_moves')
+        if ordered is None:
+            ordered = self.evaluator.order_moves(board, entry['moves'])[::-1]
+            entry['ordered_moves'] = ordered
+        return list(ordered)
+    
+    def _new_node(self, board: ChessBoard, move=None, parent=None) -> MCTSNode:
+        """Create a tree node whose moves and their ordering come from the transposition table"""
+        return MCTSNode(board, move, parent, self._ordered_moves(board),
+                        self._tt_entry(board)['moves'])
+    
+    def _root_node(self, board: ChessBoard, tree: Optional[Tuple] = None) -> MCTSNode:
+        """Search tree root for board, grown from a previous search's statistics when given"""
+        root = self._new_node(board)
+        if tree is not None:
+            self._grow_tree(root, tree)
+        return root
+    
+    def _grow_tree(self, node: MCTSNode, tree: Tuple) -> None:
+        """Give node the decayed statistics of tree and rebuild the children it records"""
+        visits, wins, children = tree
+        node.visits = round(visits * TREE_DECAY)
+        node.wins = wins * node.visits / visits if visits else 0.0
+        if node.visits:
+            node._inv_sqrt_visits = 1.0 / math.sqrt(node.visits)
+        for move, child_tree in children.items():
+            if move not in node.untried_moves:
+                continue
+            node.untried_moves.remove(move)
+            child_board = node.board.copy()
+            child_board.make_legal_move(*move)
+            child = self._new_node(child_board, move, node)
+            node.children.append(child)
+            self._grow_tree(child, child_tree)
     
     def search(self, board: ChessBoard) -> Optional[Tuple[int, int, int, int]]:
         """Perform MCTS search and return the best move"""
+        return self.search_tree(board)[0]
+    
+    def search_tree(self, board: ChessBoard, tree: Optional[Tuple] = None) -> Tuple[Optional[Tuple], Optional[Dict]]:
+        """Search board, continuing from a previous search's statistics
+        
+        Returns the best move and the statistics of the tree below it, as a
+        dict from the Zobrist key of each explored reply to a (visits, wins,
+        {move: subtree}) tuple, or None when no single tree was grown.  When
+        the opponent's reply leads to one of those positions, passing its
+        tuple as tree lets the next search pick up where this one left off.
+        """
+        # Trial moves are made and unmade on a private copy, never on the caller's board
+        board = board.copy()
+        
         # Quick checks
-        legal_moves = board.get_all_legal_moves()
+        legal_moves = list(self._tt_entry(board)['moves'])
         if not legal_moves:
-            return None
+            return None, None
         
         # Check for immediate checkmate
         checkmate_move = self._find_checkmate_move(board, legal_moves)
         if checkmate_move:
             print(f"🎯 Found immediate checkmate: {checkmate_move}")
-            return checkmate_move
+            return checkmate_move, None
+        
+        if self.n_processes > 1:
+            best_move = self._search_in_processes(board)
+            return best_move or self._fallback_move_selection(board, legal_moves), None
+        
+        # Run MCTS, one tree per thread on its own copy of the position
+        start_time = time.time()
+        if self.n_threads > 1 and self.tree_parallel:
+            runs = [self._run_shared_tree(board, tree)]
+        elif self.n_threads > 1:
+            budget = -(-self.max_simulations // self.n_threads)
+            with ThreadPoolExecutor(max_workers=self.n_threads) as pool:
+                runs = list(pool.map(self._run_simulations,
+                                     [board.copy() for _ in range(self.n_threads)],
+                                     [budget] * self.n_threads))
+        else:
+            runs = [self._run_simulations(board, self.max_simulations, tree)]
+        root = self._merge_roots([run_root for run_root, _ in runs])
+        simulations = sum(count for _, count in runs)
+        
+        elapsed_time = time.time() - start_time
+        print(f"MCTS completed {simulations} simulations in {elapsed_time:.2f}s")
+        
+        # Select best move
+        if root.children:
+            best_child = self._select_best_move(root)
+            win_rate = best_child.wins / max(best_child.visits, 1)
+            print(f"Best move: {best_child.move}, visits: {best_child.visits}, win rate: {win_rate:.3f}")
+            kept = None
+            if len(runs) == 1:
+                # The opponent's reply leads into this tree
+                kept = {reply.board.zobrist: _tree_stats(reply) for reply in best_child.children}
+            return best_child.move, kept
+        else:
+            # Fallback to highest priority move
+            return self._fallback_move_selection(board, legal_moves), None
+    
+    def _search_in_processes(self, board: ChessBoard) -> Optional[Tuple]:
+        """Root-parallel search: one tree per worker process, merged by move
+        
+        Each worker gets the position as FEN, its share of the simulation
+        budget and its own random seed; the most visited root move over all
+        workers wins.
+        """
+        start_time = time.time()
+        budget = -(-self.max_simulations // self.n_processes)
+        seed = random.randrange(1 << 30)
+        jobs = [(board.to_fen(), budget, seed + i, self.time_limit, self.max_depth)
+                for i in range(self.n_processes)]
+        results = self._search_process_pool().map(_run_mcts_worker, jobs)
+        
+        stats = {}
+        simulations = 0
+        for worker_simulations, worker_stats in results:
+            simulations += worker_simulations
+            for move, (visits, wins) in worker_stats.items():
+                total_visits, total_wins = stats.get(move, (0, 0))
+                stats[move] = (total_visits + visits, total_wins + wins)
         
-        # Run MCTS
-        root = MCTSNode(board.copy())
+        elapsed_time = time.time() - start_time
+        print(f"MCTS completed {simulations} simulations in {elapsed_time:.2f}s "
+              f"across {self.n_processes} processes")
+        if not stats:
+            return None
+        best_move = max(stats, key=lambda move: stats[move][0])
+        visits, wins = stats[best_move]
+        print(f"Best move: {best_move}, visits: {visits}, win rate: {wins / max(visits, 1):.3f}")
+        return best_move
+    
+    def _search_process_pool(self) -> ProcessPoolExecutor:
+        """The root-parallel search process pool, started on first use"""
+        if self._search_pool is None:
+            self._search_pool = ProcessPoolExecutor(max_workers=self.n_processes,
+                                                    mp_context=pool_context())
+        return self._search_pool
+    
+    def _run_simulations(self, board: ChessBoard, max_simulations: int,
+                         tree: Optional[Tuple] = None) -> Tuple[MCTSNode, int]:
+        """Grow a search tree rooted at board, from tree's statistics if given; returns the root and the simulation count"""
+        if self.concurrency > 1:
+            return self._run_wu_uct(board, max_simulations, tree)
+        root = self._root_node(board, tree)
         start_time = time.time()
         simulations = 0
         
         while (time.time() - start_time < self.time_limit and 
-               simulations < self.max_simulations):
+               simulations < max_simulations):
             
             # Selection & Expansion
             node = self._select_and_expand(root, 0)
             if node is None:
                 continue
             
-            # Simulation
-            result = self._simulate(node.board.copy(), 0)
-            
-            # Backpropagation
-            self._backpropagate(node, result)
-            
-            simulations += 1
+            if self.leaf_rollouts > 1:
+                # Leaf parallelism: several rollouts from the leaf, backed up together
+                results = self._simulate_in_pool(node.board)
+                self._backpropagate_batch(node, results)
+                simulations += len(results)
+            else:
+                # Simulation (plays out on the node's board and takes the moves back)
+                result = self._simulate(node.board, 0)
+                
+                # Backpropagation
+                self._backpropagate(node, result)
+                
+                simulations += 1
             
             # Early termination check
             if simulations % 100 == 0 and time.time() - start_time > self.time_limit * 0.9:
                 break
         
-        elapsed_time = time.time() - start_time
-        print(f"MCTS completed {simulations} simulations in {elapsed_time:.2f}s")
+        return root, simulations
+    
+    def _run_shared_tree(self, board: ChessBoard, tree: Optional[Tuple] = None) -> Tuple[MCTSNode, int]:
+        """Grow one search tree from all n_threads threads; returns the root and the simulation count"""
+        root = self._root_node(board, tree)
+        start_time = time.time()
+        budget = -(-self.max_simulations // self.n_threads)
+        tree_lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=self.n_threads) as pool:
+            futures = [pool.submit(self._descend_shared_tree, root, tree_lock, budget, start_time)
+                       for _ in range(self.n_threads)]
+            counts = [future.result() for future in futures]
+        return root, sum(counts)
+    
+    def _descend_shared_tree(self, root: MCTSNode, tree_lock: threading.Lock,
+                             max_simulations: int, start_time: float) -> int:
+        """One thread's share of _run_shared_tree; returns its simulation count
         
-        # Select best move
-        if root.children:
-            best_child = self._select_best_move(root)
-            win_rate = best_child.wins / max(best_child.visits, 1)
-            print(f"Best move: {best_child.move}, visits: {best_child.visits}, win rate: {win_rate:.3f}")
-            return best_child.move
-        else:
-            # Fallback to highest priority move
-            return self._fallback_move_selection(board, legal_moves)
+        The tree is only touched under tree_lock.  The path to the chosen
+        leaf carries a virtual loss while the rollout runs on a copy of the
+        leaf's board, and backpropagation takes it off again.
+        """
+        simulations = 0
+        while (time.time() - start_time < self.time_limit and
+               simulations < max_simulations):
+            with tree_lock:
+                node = self._select_and_expand(root, 0)
+                if node is None:
+                    continue
+                self._add_virtual_loss(node)
+                board = node.board.copy()
+            
+            result = self._simulate(board, 0)
+            
+            with tree_lock:
+                self._backpropagate_batch(node, (result,), VIRTUAL_LOSS)
+            simulations += 1
+        return simulations
+    
+    def _add_virtual_loss(self, node: MCTSNode) -> None:
+        """Count a pending simulation as a lost visit on node and its ancestors"""
+        while node is not None:
+            node.visits += VIRTUAL_LOSS
+            node.virtual_loss += VIRTUAL_LOSS
+            node._inv_sqrt_visits = 1.0 / math.sqrt(node.visits + node.incomplete)
+            node = node.parent
+    
+    def _run_wu_uct(self, board: ChessBoard, max_simulations: int,
+                    tree: Optional[Tuple] = None) -> Tuple[MCTSNode, int]:
+        """Grow a search tree with up to concurrency rollouts pending in the process pool
+        
+        Watch-the-unobserved UCT: every node on the path to a dispatched
+        leaf counts the pending rollout in its incomplete total, which
+        ucb1_value adds to the visit counts of its exploration term, so the
+        next selections spread over other lines instead of repeating it.
+        Finished rollouts are backed up as they arrive.
+        """
+        root = self._root_node(board, tree)
+        pool = self._rollout_pool()
+        start_time = time.time()
+        simulations = 0
+        pending = {}  # rollout future -> leaf it was started from
+        
+        while True:
+            while (len(pending) < self.concurrency and
+                   simulations + len(pending) < max_simulations and
+                   time.time() - start_time < self.time_limit):
+                node = self._select_and_expand(root, 0)
+                if node is None:
+                    break
+                self._add_incomplete(node)
+                future = pool.submit(_do_rollout, node.board.to_fen(),
+                                     random.randrange(1 << 30), self.max_depth)
+                pending[future] = node
+            if not pending:
+                break
+            
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                self._backpropagate_batch(pending.pop(future), (future.result(),), incomplete=1)
+                simulations += 1
+        
+        return root, simulations
+    
+    def _add_incomplete(self, node: MCTSNode) -> None:
+        """Record a dispatched rollout on node and its ancestors"""
+        while node is not None:
+            node.incomplete += 1
+            node._inv_sqrt_visits = 1.0 / math.sqrt(node.visits + node.incomplete)
+            node = node.parent
+    
+    def _rollout_pool(self) -> ProcessPoolExecutor:
+        """The rollout process pool, started on first use"""
+        if self._sim_pool is None:
+            self._sim_pool = ProcessPoolExecutor(max_workers=max(self.leaf_rollouts, self.concurrency),
+                                                 mp_context=pool_context())
+        return self._sim_pool
+    
+    def _simulate_in_pool(self, board: ChessBoard) -> List:
+        """Play leaf_rollouts independent simulations of board in worker processes"""
+        fen = board.to_fen()
+        futures = [self._rollout_pool().submit(_do_rollout, fen, random.randrange(1 << 30), self.max_depth)
+                   for _ in range(self.leaf_rollouts)]
+        return [future.result() for future in futures]
+    
+    def close(self) -> None:
+        """Shut down the rollout and search process pools, if they were started"""
+        if self._sim_pool is not None:
+            self._sim_pool.shutdown()
+            self._sim_pool = None
+        if self._search_pool is not None:
+            self._search_pool.shutdown()
+            self._search_pool = None
+    
+    def _merge_roots(self, roots: List[MCTSNode]) -> MCTSNode:
+        """Fold the root statistics of parallel trees into the first tree
+        
+        Children reached by the same move are combined by summing their
+        visits and wins; moves only some trees explored are adopted as is.
+        """
+        root = roots[0]
+        children = {child.move: child for child in root.children}
+        for other in roots[1:]:
+            root.visits += other.visits
+            root.wins += other.wins
+            for child in other.children:
+                merged = children.get(child.move)
+                if merged is None:
+                    child.parent = root
+                    root.children.append(child)
+                    children[child.move] = child
+                else:
+                    merged.visits += child.visits
+                    merged.wins += child.wins
+        return root
     
     def _find_checkmate_move(self, board: ChessBoard, moves: List[Tuple]) -> Optional[Tuple]:
-        """Find immediate checkmate moves"""
+        """Find immediate checkmate moves among legal moves"""
         for move in moves:
-            temp_board = board.copy()
-            if temp_board.make_move(move[0], move[1], move[2], move[3]):
-                if temp_board.is_checkmate():
-                    return move
+            board.make_legal_move(*move)
+            is_mate = board.is_checkmate()
+            board.unmake_move()
+            if is_mate:
+                return move
         return None
     
     def _select_and_expand(self, root: MCTSNode, depth: int = 0) -> Optional[MCTSNode]:
@@ -149,180 +530,208 @@ class ChessMCTS:
             if not node.untried_moves:
                 return node
             
-            move = node.untried_moves.pop(0)  # Take highest priority move
+            move = node.untried_moves.pop()  # Take highest priority move
             new_board = node.board.copy()
-            
-            try:
-                # Handle different move formats
-                success = False
-                if len(move) > 4:
-                    success = new_board.make_move(move[0], move[1], move[2], move[3], move[4])
-                else:
-                    success = new_board.make_move(move[0], move[1], move[2], move[3])
-                
-                if success:
-                    child = MCTSNode(new_board, move, node)
-                    node.children.append(child)
-                    return child
-                else:
-                    # Try again with remaining moves
-                    if node.untried_moves:
-                        return self._select_and_expand(node, current_depth)
-                    else:
-                        return node
-            except Exception:
-                # Handle move errors gracefully
-                if node.untried_moves:
-                    return self._select_and_expand(node, current_depth)
-                else:
-                    return node
+            # Untried moves come from the legal move list
+            new_board.make_legal_move(*move)
+            child = self._new_node(new_board, move, node)
+            node.children.append(child)
+            return child
         
         return node
     
     def _simulate(self, board: ChessBoard, depth: int = 0) -> Color:
-        """Run a simulation from the given position"""
+        """Run a simulation from the given position
+        
+        The moves are played on the board itself and unmade before returning,
+        so the board is left exactly as it was passed in.
+        """
         simulation_moves = 0
+        max_moves = min(self.simulation_depth_limit, self.max_depth * 2 - depth)
+        # Why the rollout ended, when the loop found out itself; a rollout cut
+        # off by the move limit has not looked at its last position yet
+        reason = None
         
-        while (not board.is_checkmate() and 
-               not board.is_stalemate() and 
-               not board.is_draw_by_fifty_moves() and
-               not board.is_insufficient_material() and
-               simulation_moves < self.simulation_depth_limit and
-               depth + simulation_moves < self.max_depth * 2):
-            
-            moves = board.get_all_legal_moves()
-            if not moves:
-                break
-            
-            # Intelligent move selection
-            move = self._select_simulation_move(board, moves)
-            if not move:
-                break
-            
-            try:
-                success = False
-                if len(move) > 4:
-                    success = board.make_move(move[0], move[1], move[2], move[3], move[4])
-                else:
-                    success = board.make_move(move[0], move[1], move[2], move[3])
+        try:
+            while simulation_moves < max_moves:
+                # An empty move list is checkmate or stalemate
+                moves = self._tt_entry(board)['moves']
+                if not moves:
+                    reason = 'no_moves'
+                    break
+                if board.is_draw_by_fifty_moves() or board.is_insufficient_material():
+                    reason = 'draw'
+                    break
                 
-                if not success:
+                # Intelligent move selection
+                move = self._select_simulation_move(board, moves)
+                if not move:
                     break
-            except Exception:
-                break
+                
+                # Moves come from the legal move list, so they skip make_move's
+                # legality test
+                board.make_legal_move(*move)
+                simulation_moves += 1
             
-            simulation_moves += 1
-        
-        return self._evaluate_final_position(board)
+            return self._evaluate_final_position(board, reason)
+        finally:
+            for _ in range(simulation_moves):
+                board.unmake_move()
     
     def _select_simulation_move(self, board: ChessBoard, moves: List[Tuple]) -> Optional[Tuple]:
         """Select a move during simulation with intelligent heuristics"""
         if not moves:
             return None
         
-        # Categorize moves
+        # The move probabilities only depend on the position, so they are
+        # worked out once per Zobrist key and every later rollout through it
+        # draws its move with one random number and a bisect of the
+        # cumulative weights (what random.choices does, minus its overhead)
+        entry = self._tt_entry(board)
+        policy = entry.get('rollout_policy')
+        if policy is None:
+            policy = self._rollout_policy(self._categorize_simulation_moves(board, moves), moves)
+            entry['rollout_policy'] = policy
+        policy_moves, cum_weights = policy
+        last = len(policy_moves) - 1
+        return policy_moves[bisect(cum_weights, random.random() * cum_weights[last], 0, last)]
+    
+    def _rollout_policy(self, categories: Tuple[List[Tuple], ...],
+                        moves: List[Tuple]) -> Tuple[List[Tuple], List[float]]:
+        """Rollout move probabilities as (moves, cumulative weights)
+        
+        Checkmates are always played.  Otherwise checks take the first 70%
+        of the probability, captures the rest up to 80% (the best capture
+        70% of that share, all captures evenly the remaining 30%), and normal
+        moves, or failing those the first legal move, whatever is left.
+        """
+        checkmate_moves, check_moves, capture_moves, normal_moves = categories
+        if checkmate_moves:
+            return checkmate_moves, list(accumulate([1.0] * len(checkmate_moves)))
+        
+        weights = {}
+        
+        def spread(share_moves, share):
+            for move in share_moves:
+                weights[move] = weights.get(move, 0.0) + share / len(share_moves)
+        
+        claimed = 0.0
+        if check_moves:
+            spread(check_moves, 0.7)
+            claimed = 0.7
+        if capture_moves:
+            share = 0.8 - claimed
+            spread(capture_moves[:1], 0.7 * share)
+            spread(capture_moves, 0.3 * share)
+            claimed = 0.8
+        spread(normal_moves or moves[:1], 1.0 - claimed)
+        return list(weights), list(accumulate(weights.values()))
+    
+    def _categorize_simulation_moves(self, board: ChessBoard, moves: List[Tuple]) -> Tuple[List[Tuple], ...]:
+        """Split moves into checkmates, checks, captures and normal moves
+        
+        Each move is classified by the first stage it falls into, so checks
+        are never scored again as captures.  Captures come back sorted by
+        move priority, highest first; without a check that is the victim's
+        value plus the centre bonus, worked out here directly.
+        """
         checkmate_moves = []
         check_moves = []
         capture_moves = []
-        tactical_moves = []
         normal_moves = []
+        squares = board.squares
         
         for move in moves:
-            try:
-                temp_board = board.copy()
-                success = False
-                if len(move) > 4:
-                    success = temp_board.make_move(move[0], move[1], move[2], move[3], move[4])
-                else:
-                    success = temp_board.make_move(move[0], move[1], move[2], move[3])
-                
-                if not success:
-                    continue
-                
-                opponent_color = Color.BLACK if board.current_player == Color.WHITE else Color.WHITE
-                
-                # Check for checkmate
-                if temp_board.is_checkmate():
+            # Only a checking move can mate; those are made, tested and taken
+            # back on the board itself rather than on a copy
+            if board.gives_check(move[0], move[1], move[2], move[3]):
+                board.make_legal_move(*move)
+                is_mate = board.is_checkmate()
+                board.unmake_move()
+                if is_mate:
                     checkmate_moves.append(move)
-                    continue
-                
-                # Check for check
-                if temp_board.is_in_check(opponent_color):
-                    check_moves.append(move)
-                    continue
-                
-                # Check for captures
-                if board.board[move[2]][move[3]]:
-                    capture_moves.append(move)
-                    continue
-                
-                # Check for tactical moves
-                priority = self.evaluator.get_move_priority(board, move)
-                if priority > 100:
-                    tactical_moves.append(move)
                 else:
-                    normal_moves.append(move)
-                    
-            except Exception:
+                    check_moves.append(move)
                 continue
+            
+            # Check for captures.  A quiet move that gives no check scores at
+            # most the centre bonus, so it is always a normal move
+            to_sq = move[2] * 8 + move[3]
+            victim = squares[to_sq]
+            if victim:
+                capture_moves.append((CAPTURE_VALUES[abs(victim)] + (2 if (1 << to_sq) & CENTER_MASK else 0),
+                                      move))
+            else:
+                normal_moves.append(move)
         
-        # Select move with weighted probabilities
-        rand = random.random()
-        if checkmate_moves:
-            return random.choice(checkmate_moves)
-        elif check_moves and rand < 0.7:
-            return random.choice(check_moves)
-        elif capture_moves and rand < 0.8:
-            # Prefer good captures
-            try:
-                capture_moves.sort(key=lambda m: self.evaluator.get_move_priority(board, m), reverse=True)
-                if random.random() < 0.7 and capture_moves:
-                    return capture_moves[0]
-                return random.choice(capture_moves)
-            except:
-                return random.choice(capture_moves) if capture_moves else None
-        elif tactical_moves and rand < 0.6:
-            return random.choice(tactical_moves)
-        elif normal_moves:
-            return random.choice(normal_moves)
-        else:
-            return moves[0] if moves else None
+        capture_moves.sort(key=itemgetter(0), reverse=True)
+        capture_moves = [move for _, move in capture_moves]
+        return checkmate_moves, check_moves, capture_moves, normal_moves
     
-    def _evaluate_final_position(self, board: ChessBoard) -> Color:
-        """Evaluate the final position of a simulation"""
-        game_result = board.get_game_result()
+    def _evaluate_final_position(self, board: ChessBoard, reason: Optional[str] = None) -> Color:
+        """Evaluate the final position of a simulation
         
+        reason says why the rollout stopped, when the caller already knows:
+        'no_moves' (checkmate or stalemate) or 'draw' (fifty-move rule or
+        insufficient material).  Without one the full game result is
+        worked out.
+        """
+        if reason == 'no_moves':
+            if not board.is_in_check(board.current_player):
+                return 'draw'
+            return Color.BLACK if board.current_player == Color.WHITE else Color.WHITE
+        if reason == 'draw':
+            return 'draw'
+        
+        game_result = board.get_game_result()
         if game_result == GameResult.WHITE_WINS:
             return Color.WHITE
         elif game_result == GameResult.BLACK_WINS:
             return Color.BLACK
         elif game_result == GameResult.DRAW:
             return 'draw'
-        else:
-            # Use evaluation function for unfinished games
+        
+        # Use evaluation function for unfinished games
+        entry = self._tt_entry(board)
+        score = entry.get('eval')
+        if score is None:
             score = self.evaluator.evaluate_position(board)
-            
-            if abs(score) < 100:
-                return 'draw'
-            elif abs(score) < 300:
-                return 'draw' if random.random() < 0.3 else (Color.WHITE if score > 0 else Color.BLACK)
-            else:
-                return Color.WHITE if score > 0 else Color.BLACK
+            entry['eval'] = score
+        
+        if abs(score) < 100:
+            return 'draw'
+        elif abs(score) < 300:
+            return 'draw' if random.random() < 0.3 else (Color.WHITE if score > 0 else Color.BLACK)
+        else:
+            return Color.WHITE if score > 0 else Color.BLACK
     
-    def _backpropagate(self, node: MCTSNode, result) -> None:
-        """Backpropagate the simulation result up the tree"""
+    def _backpropagate_batch(self, node: MCTSNode, results: Sequence, virtual_loss: int = 0,
+                             incomplete: int = 0) -> None:
+        """Backpropagate several simulation results from the same leaf in one pass
+        
+        virtual_loss and incomplete are what _add_virtual_loss and
+        _add_incomplete put on the path for these simulations; they are
+        taken back off each node.
+        """
+        visits = len(results) - virtual_loss
+        draws = 0.5 * results.count('draw')
+        # Wins credited to a node, by the side that played its move
+        gains = (draws + results.count(Color.WHITE), draws + results.count(Color.BLACK))
         while node is not None:
-            node.visits += 1
-            
-            if result == 'draw':
-                node.wins += 0.5
-            elif node.move:  # Not root node
-                move_player = Color.BLACK if node.board.current_player == Color.WHITE else Color.WHITE
-                if result == move_player:
-                    node.wins += 1
-            
+            node.visits += visits
+            if virtual_loss:
+                node.virtual_loss -= virtual_loss
+            if incomplete:
+                node.incomplete -= incomplete
+            node._inv_sqrt_visits = 1.0 / math.sqrt(node.visits + node.incomplete)
+            move_player = node.move_player
+            node.wins += draws if move_player is None else gains[move_player]
             node = node.parent
     
+    def _backpropagate(self, node: MCTSNode, result) -> None:
+        """Backpropagate the simulation result up the tree"""
+        self._backpropagate_batch(node, (result,))
+    
     def _select_best_move(self, root: MCTSNode) -> MCTSNode:
         """Select the best move using robust criteria"""
         if not root.children:
@@ -358,16 +767,64 @@ class ChessMCTS:
         if not legal_moves:
             return None
         
-        # Sort by priority and return best move
-        safe_moves = []
-        for move in legal_moves:
-            temp_board = board.copy()
-            if temp_board.make_move(move[0], move[1], move[2], move[3]):
-                priority = self.evaluator.get_move_priority(board, move)
-                safe_moves.append((move, priority))
-        
-        if safe_moves:
-            safe_moves.sort(key=lambda x: x[1], reverse=True)
-            return safe_moves[0][0]
-        
-        return legal_moves[0]
+        # The moves are already legal, so the highest priority one is played
+        return max(legal_moves, key=lambda move: self.evaluator.get_move_priority(board, move))
+
+
+def _tree_stats(node: MCTSNode) -> Tuple[int, float, Dict]:
+    """(visits, wins, {move: child statistics}) of the tree under node
+    
+    Plain tuples, a few kilobytes for a full search, so a search's tree can
+    travel between processes with the game's next search.
+    """
+    return (node.visits, node.wins,
+            {child.move: _tree_stats(child) for child in node.children})
+
+
+def _run_mcts_worker(job: Tuple[str, int, int, float, int]) -> Tuple[int, Dict[Tuple, Tuple[int, float]]]:
+    """Process pool entry point: grow one tree from a FEN position
+    
+    Returns the simulation count and {root move: (visits, wins)}.
+    """
+    fen, max_simulations, seed, time_limit, max_depth = job
+    random.seed(seed)
+    engine = ChessMCTS(time_limit=time_limit, max_simulations=max_simulations, max_depth=max_depth)
+    root, simulations = engine._run_simulations(ChessBoard.from_fen(fen), max_simulations)
+    return simulations, {child.move: (child.visits, child.wins) for child in root.children}
+
+
+# Engine reused by every rollout a worker process plays, so its
+# transposition table carries over between rollouts
+_rollout_engine = None
+
+
+def _do_rollout(fen: str, seed: int, max_depth: int):
+    """Process pool entry point: play one simulation from a FEN position"""
+    global _rollout_engine
+    if _rollout_engine is None or _rollout_engine.max_depth != max_depth:
+        _rollout_engine = ChessMCTS(max_depth=max_depth)
+    random.seed(seed)
+    return _rollout_engine._simulate(ChessBoard.from_fen(fen), 0)
+
+
+# Engine reused by every search a worker process runs, so its
+# transposition table carries over between searches
+_search_engine = None
+
+
+def search_fen(fen: str, history: Sequence[int], tree: Optional[Tuple], time_limit: float,
+               max_simulations: int, max_depth: int):
+    """Process pool entry point: search a FEN position, see ChessMCTS.search_tree
+    
+    history is the game board's repetition_history(), so the search still
+    sees repetitions of positions played before the FEN one.  tree holds the
+    statistics kept from the game's previous search, if any; the best move
+    is returned along with the statistics to keep for the next one.
+    """
+    global _search_engine
+    if _search_engine is None:
+        _search_engine = ChessMCTS()
+    _search_engine.time_limit = time_limit
+    _search_engine.max_simulations = max_simulations
+    _search_engine.max_depth = max_depth
+    return _search_engine.search_tree(ChessBoard.from_fen(fen, history), tree)
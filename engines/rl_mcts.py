@@ -5,11 +5,17 @@ import json
 import random
 import time
 from collections import deque
+from itertools import islice
 from typing import Dict, Optional
 from engines.mcts import ChessMCTS, MCTSNode
-from models.chess_board import ChessBoard, Color
+from models.chess_board import BISHOP, KING, KNIGHT, ChessBoard, Color
+from models.evaluator import CENTER_MASK, EXTENDED_CENTER_MASK
 from data.rl_data import GameDataRecorder
 
+# Capture bonuses indexed by integer piece code (slot 0 is an empty square)
+RL_CAPTURE_VALUES = (0, 0.1, 0.3, 0.3, 0.5, 0.9, 0)
+SIMPLE_CAPTURE_VALUES = (0, 1, 3, 3, 5, 9, 100)
+
 
 class RLEnhancedMCTS(ChessMCTS):
     """MCTS enhanced with Reinforcement Learning for better move evaluation"""
@@ -133,7 +139,8 @@ class RLEnhancedMCTS(ChessMCTS):
         if not node.is_terminal() and node.untried_moves:
             # Sort moves by RL values
             rl_sorted_moves = []
-            for move in node.untried_moves[:10]:  # Limit for performance
+            # The ten highest priority moves sit at the end of untried_moves
+            for move in reversed(node.untried_moves[-10:]):  # Limit for performance
                 rl_value = self._get_rl_move_value(node.board, move)
                 priority = self.evaluator.get_move_priority(node.board, move)
                 combined_score = priority + self.rl_weight * rl_value * 10
@@ -160,13 +167,7 @@ class RLEnhancedMCTS(ChessMCTS):
     
     def _make_move_safe(self, board: ChessBoard, move: tuple) -> bool:
         """Safely make a move on the board"""
-        try:
-            if len(move) > 4:
-                return board.make_move(move[0], move[1], move[2], move[3], move[4])
-            else:
-                return board.make_move(move[0], move[1], move[2], move[3])
-        except Exception:
-            return False
+        return board.try_make_move(*move)
     
     def _get_rl_move_value(self, board: ChessBoard, move: tuple) -> float:
         """Get RL-based value estimation for a move"""
@@ -177,35 +178,32 @@ class RLEnhancedMCTS(ChessMCTS):
         from_row, from_col, to_row, to_col = move[:4]
         
         # Center control bonus
-        if (to_row, to_col) in [(3, 3), (3, 4), (4, 3), (4, 4)]:
+        to_bit = 1 << (to_row * 8 + to_col)
+        if to_bit & CENTER_MASK:
             value += 0.3
-        elif (to_row, to_col) in [(2, 2), (2, 3), (2, 4), (2, 5), (3, 2), (3, 5), 
-                                  (4, 2), (4, 5), (5, 2), (5, 3), (5, 4), (5, 5)]:
+        elif to_bit & EXTENDED_CENTER_MASK:
             value += 0.1
         
         # Development bonus
-        piece = board.board[from_row][from_col]
+        piece = board.board[from_row * 8 + from_col]
         if piece and not piece.has_moved:
-            if piece.type.value in ['N', 'B']:  # Knight or Bishop
+            if piece.kind == KNIGHT or piece.kind == BISHOP:
                 value += 0.2
         
         # Capture evaluation
-        target = board.board[to_row][to_col]
-        if target:
-            piece_values = {'P': 0.1, 'N': 0.3, 'B': 0.3, 'R': 0.5, 'Q': 0.9}
-            value += piece_values.get(target.type.value, 0)
+        value += RL_CAPTURE_VALUES[abs(board.squares[to_row * 8 + to_col])]
         
         # King safety consideration
-        if piece and piece.type.value == 'K':
-            total_pieces = sum(1 for r in range(8) for c in range(8) if board.board[r][c])
+        if piece and piece.kind == KING:
+            total_pieces = board.piece_count
             if total_pieces > 20:  # Opening/middlegame
                 if 2 <= to_row <= 5 and 2 <= to_col <= 5:
                     value -= 0.4
         
         # Pattern recognition from position history
         if len(self.position_history) > 5:
-            recent_positions = list(self.position_history)[-5:]
-            for pos_data in recent_positions:
+            # The last five entries, without copying the whole deque
+            for pos_data in islice(reversed(self.position_history), 5):
                 if 'result' in pos_data:
                     result_value = pos_data['result']
                     if result_value == 'good':
@@ -324,21 +322,19 @@ class RLEnhancedMCTS(ChessMCTS):
         from_row, from_col, to_row, to_col = move[:4]
         
         # Capture bonus
-        target = board.board[to_row][to_col]
-        if target:
-            piece_values = {'P': 1, 'N': 3, 'B': 3, 'R': 5, 'Q': 9, 'K': 100}
-            score += piece_values.get(target.type.value, 0) * 10
+        score += SIMPLE_CAPTURE_VALUES[abs(board.squares[to_row * 8 + to_col])] * 10
         
         # Center control bonus
-        if (to_row, to_col) in [(3, 3), (3, 4), (4, 3), (4, 4)]:
+        to_bit = 1 << (to_row * 8 + to_col)
+        if to_bit & CENTER_MASK:
             score += 5
-        elif 2 <= to_row <= 5 and 2 <= to_col <= 5:
+        elif to_bit & EXTENDED_CENTER_MASK:
             score += 2
         
         # Development bonus for pieces that haven't moved
-        piece = board.board[from_row][from_col]
+        piece = board.board[from_row * 8 + from_col]
         if piece and not piece.has_moved:
-            if piece.type.value in ['N', 'B']:
+            if piece.kind == KNIGHT or piece.kind == BISHOP:
                 score += 3
         
         # Add some randomness for variety
@@ -4,22 +4,25 @@ All chess logic, MCTS, RL, and game management has been moved to separate module
 This file contains only the FastAPI app setup and API endpoints.
 """
 
-from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect, Depends
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Dict, List
 import uvicorn
-import uuid
 import asyncio
-from threading import Thread
+import heapq
+import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 
 # Import our modular components
 from models.chess_board import GameMode, GameResult
-from session.game_session import SessionManager
-from multiplayer.features import InvitationManager, WebSocketManager
+from session.game_session import GameSession, SearchBusyError, SessionManager
+from multiplayer.features import InvitationManager, WebSocketManager, dumps_message
 from api.models import (
     CreateSessionRequest, MakeMoveRequest, CreateInvitationRequest,
     JoinSessionRequest, SessionInfoResponse, InvitationResponse
@@ -27,11 +30,47 @@ from api.models import (
 from api.websocket_handlers import handle_websocket_message
 from data.rl_data import GameDataRecorder
 
+# orjson encodes the board state several times faster than the stdlib json
+# encoder; without it responses fall back to FastAPI's default JSONResponse
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the periodic maintenance jobs and the RL recorder on the event loop for the app's lifetime"""
+    # asyncio.to_thread runs AI searches and move validation in the default
+    # executor; size it to the cores (plus one for quick move checks) so
+    # concurrent searches do not oversubscribe the CPU
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) + 1, thread_name_prefix="chess"))
+    session_manager.start_search_pool()
+    tasks = [
+        asyncio.create_task(run_periodic_tasks()),
+        asyncio.create_task(record_rl_games())
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    # Let the tasks finish unwinding, so none still takes from the queue
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Games still waiting in the queue are written before exiting
+    leftover = []
+    while not rl_queue.empty():
+        leftover.append(rl_queue.get_nowait())
+    if leftover:
+        await asyncio.to_thread(rl_data_recorder.record_many, leftover)
+    session_manager.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Modular Chess Engine API",
     description="Production-ready chess engine with MCTS, RL, and real-time multiplayer",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=DefaultResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -56,50 +95,125 @@ rl_data_recorder = GameDataRecorder()
 # Initialize RL data recorder
 rl_data_recorder._init_database()
 
+# Finished RL games waiting to be written by record_rl_games, so the SQLite
+# insert stays out of the response to the game-ending move
+rl_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
+RL_BATCH_SIZE = 64
+
 # ===== UTILITY FUNCTIONS =====
 
-def cleanup_expired_sessions():
-    """Background task to clean up expired sessions and invitations"""
+async def require_session(session_id: str) -> GameSession:
+    """Dependency that looks up the session named in the path exactly once"""
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+async def gated_ai_move(session: GameSession):
+    """The session's next AI move
+    
+    A search that finds every slot taken is turned away with 503 rather than
+    queueing behind the others and dragging down every other endpoint's
+    latency.
+    """
+    try:
+        return await session.next_ai_move()
+    except SearchBusyError:
+        raise HTTPException(status_code=503, detail="Server busy")
+
+def queue_rl_game(session: GameSession, game_result: GameResult):
+    """Queue a finished game's data for RL training"""
+    try:
+        rl_queue.put_nowait({
+            'board_state': session.board.to_dict(),
+            'move_sequence': list(session.board.move_history),
+            'player_won': game_result == GameResult.WHITE_WINS,  # Assuming human is white
+            'game_result': game_result.value
+        })
+    except asyncio.QueueFull:
+        print("⚠️ RL data queue full, dropping game record")
+
+async def record_rl_games():
+    """Background task writing queued RL games, up to RL_BATCH_SIZE per transaction"""
     while True:
+        batch = [await rl_queue.get()]
+        while len(batch) < RL_BATCH_SIZE and not rl_queue.empty():
+            batch.append(rl_queue.get_nowait())
         try:
-            session_manager.cleanup_expired_sessions()
-            invitation_manager.cleanup_expired_invitations()
-            time.sleep(60)  # Run every minute
+            await asyncio.to_thread(rl_data_recorder.record_many, batch)
         except Exception as e:
-            print(f"❌ Error in cleanup task: {e}")
-            time.sleep(60)
+            print(f"❌ Error recording RL data: {e}")
 
-def update_rl_engines():
-    """Background task to periodically update RL engines with new data"""
+async def cleanup_expired():
+    """Clean up expired sessions and invitations
+    
+    The scan and the RL records of finished games run in worker threads, but
+    sessions are removed here on the event loop, where get_session and the
+    RL update read the session table without a lock.
+    """
+    expired = await asyncio.to_thread(session_manager.expired_session_ids)
+    for session in session_manager.remove_sessions(expired):
+        if session.use_rl_engine:
+            await asyncio.to_thread(session.finish_game, "expired")
+    await asyncio.to_thread(invitation_manager.cleanup_expired_invitations)
+
+# Highest RL game ID already fed to the RL engines
+_rl_last_game_id = 0
+
+async def update_rl_engines():
+    """Feed the games finished since the last pass to the RL sessions' engines"""
+    global _rl_last_game_id
+    # Only games finished since the last pass (SQLite, so off the loop)
+    new_games, _rl_last_game_id = await asyncio.to_thread(
+        rl_data_recorder.get_games_since, _rl_last_game_id, 100)
+    if not new_games:
+        return
+    # Successful patterns, built once and shared by every RL session
+    white_wins = GameResult.WHITE_WINS.value
+    entries = [
+        {
+            'position': game['final_position'],
+            'result': 'good' if game['result'] == white_wins else 'neutral'  # Assuming human is white
+        }
+        for game in new_games
+    ]
+    get_session = session_manager.sessions.get
+    for session_id in list(session_manager.rl_sessions):
+        session = get_session(session_id)
+        engine = session._rl_mcts_engine if session else None
+        if engine is not None:
+            # position_history is a bounded deque, so old entries drop off
+            engine.position_history.extend(entries)
+
+# Periodic maintenance jobs: name -> (interval in seconds, job).  Coroutine
+# functions are awaited on the event loop, plain functions run in a worker
+# thread so a slow pass does not stall the requests
+PERIODIC_TASKS = {
+    'cleanup': (60, cleanup_expired),  # Every minute
+    'rl_update': (300, update_rl_engines),  # Every 5 minutes
+}
+
+async def run_periodic_tasks():
+    """Background task running every PERIODIC_TASKS job from one timer heap
+    
+    Each job runs once at startup and then every interval after it finished,
+    so a single task wakes up for whichever job is due next.
+    """
+    now = time.monotonic()
+    scheduler = [(now, name, job) for name, (_, job) in PERIODIC_TASKS.items()]
+    heapq.heapify(scheduler)
     while True:
+        due, name, job = scheduler[0]
+        await asyncio.sleep(max(0.0, due - time.monotonic()))
+        heapq.heappop(scheduler)
         try:
-            # Get recent game data and update RL engines
-            recent_data = rl_data_recorder.get_recent_games(limit=100)
-            if recent_data:
-                # Update RL engines in active sessions
-                for session in session_manager.sessions.values():
-                    if hasattr(session, 'rl_mcts_engine') and session.rl_mcts_engine:
-                        # Update position history with recent successful patterns
-                        for data in recent_data[-10:]:  # Use last 10 entries
-                            session.rl_mcts_engine.position_history.append({
-                                'position': data['board_state'],
-                                'result': 'good' if data['player_won'] else 'neutral'
-                            })
-                            # Limit history size
-                            if len(session.rl_mcts_engine.position_history) > 1000:
-                                session.rl_mcts_engine.position_history.popleft()
-            
-            time.sleep(300)  # Run every 5 minutes
+            if asyncio.iscoroutinefunction(job):
+                await job()
+            else:
+                await asyncio.to_thread(job)
         except Exception as e:
-            print(f"❌ Error in RL update task: {e}")
-            time.sleep(300)
-
-# Start background tasks
-cleanup_thread = Thread(target=cleanup_expired_sessions, daemon=True)
-cleanup_thread.start()
-
-rl_update_thread = Thread(target=update_rl_engines, daemon=True) 
-rl_update_thread.start()
+            print(f"❌ Error in {name} task: {e}")
+        heapq.heappush(scheduler, (time.monotonic() + PERIODIC_TASKS[name][0], name, job))
 
 # ===== MAIN PAGE =====
 
@@ -134,12 +248,9 @@ async def create_session(request: CreateSessionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/session/{session_id}", response_model=SessionInfoResponse)
-async def get_session(session_id: str):
+async def get_session(session_id: str,
+                      session: GameSession = Depends(require_session)):
     """Get current session state"""
-    session = session_manager.get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     return SessionInfoResponse(
         session_id=session_id,
         success=True,
@@ -147,57 +258,50 @@ async def get_session(session_id: str):
     )
 
 @app.post("/api/session/{session_id}/move")
-async def make_move(session_id: str, request: MakeMoveRequest):
+async def make_move(session_id: str, request: MakeMoveRequest,
+                    session: GameSession = Depends(require_session)):
     """Make a move in the game"""
-    session = session_manager.get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     try:
-        success = session.make_move(
-            request.from_pos[0], request.from_pos[1],
-            request.to_pos[0], request.to_pos[1],
-            request.promotion.type if request.promotion else None,
-            request.promotion.piece if request.promotion else None
-        )
-        
-        if not success:
-            raise HTTPException(status_code=400, detail="Invalid move")
+        promo_type, promo_piece = request.promo
+        async with session.lock:
+            # Move validation runs in a worker thread, off the event loop
+            success = await asyncio.to_thread(
+                session.make_move,
+                request.from_pos[0], request.from_pos[1],
+                request.to_pos[0], request.to_pos[1],
+                promo_type, promo_piece
+            )
+            
+            if not success:
+                raise HTTPException(status_code=400, detail="Invalid move")
+            
+            # Let the AI start thinking about its reply straight away
+            await session.start_ai_precompute()
+            
+            # Check if game is finished
+            game_result = session.board.get_game_result()
         
-        # Check if game is finished
-        game_result = session.board.get_game_result()
         if game_result != GameResult.IN_PROGRESS:
             session.finish_game(game_result.value)
             
             # Record game data for RL if this was an RL-enhanced session
             if session.use_rl_engine:
-                try:
-                    winner = None
-                    if game_result == GameResult.WHITE_WINS:
-                        winner = 'white'
-                    elif game_result == GameResult.BLACK_WINS:
-                        winner = 'black'
-                    
-                    rl_data_recorder.record_game(
-                        board_state=session.board.to_dict(),
-                        move_sequence=session.board.move_history,
-                        player_won=(winner == 'white'),  # Assuming human is white
-                        game_result=game_result.value
-                    )
-                except Exception as e:
-                    print(f"❌ Error recording RL data: {e}")
+                queue_rl_game(session, game_result)
+        
+        # One snapshot serves both the broadcast and the response
+        game_state = session.to_dict()
         
         # Notify WebSocket clients if this is a multiplayer game
         if session.mode == GameMode.HUMAN_VS_HUMAN:
-            await websocket_manager.broadcast_to_session(session_id, {
+            websocket_manager.enqueue(session_id, {
                 "type": "move_made",
-                "game_state": session.to_dict(),
+                "game_state": game_state,
                 "game_result": game_result.value
             })
         
         return {
             "success": True,
-            "game_state": session.to_dict(),
+            "game_state": game_state,
             "game_result": game_result.value
         }
         
@@ -207,44 +311,30 @@ async def make_move(session_id: str, request: MakeMoveRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/session/{session_id}/ai_move")
-async def get_ai_move(session_id: str):
+async def get_ai_move(session_id: str,
+                      session: GameSession = Depends(require_session)):
     """Get AI move for Human vs AI mode"""
-    session = session_manager.get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     try:
-        ai_move = session.get_ai_move()
-        if not ai_move:
-            raise HTTPException(status_code=400, detail="No AI move available")
-        
-        # Actually execute the AI move on the board
-        move_success = session.make_move(ai_move[0], ai_move[1], ai_move[2], ai_move[3])
-        if not move_success:
-            raise HTTPException(status_code=500, detail="Failed to execute AI move")
+        async with session.lock:
+            ai_move = await gated_ai_move(session)
+            if not ai_move:
+                raise HTTPException(status_code=400, detail="No AI move available")
+            
+            # Actually execute the AI move on the board, validated in a worker thread
+            move_success = await asyncio.to_thread(
+                session.make_move, ai_move[0], ai_move[1], ai_move[2], ai_move[3])
+            if not move_success:
+                raise HTTPException(status_code=500, detail="Failed to execute AI move")
+            
+            # Check if game is finished after AI move
+            game_result = session.board.get_game_result()
         
-        # Check if game is finished after AI move
-        game_result = session.board.get_game_result()
         if game_result != GameResult.IN_PROGRESS:
             session.finish_game(game_result.value)
             
             # Record game data for RL
             if session.use_rl_engine:
-                try:
-                    winner = None
-                    if game_result == GameResult.WHITE_WINS:
-                        winner = 'white'
-                    elif game_result == GameResult.BLACK_WINS:
-                        winner = 'black'
-                    
-                    rl_data_recorder.record_game(
-                        board_state=session.board.to_dict(),
-                        move_sequence=session.board.move_history,
-                        player_won=(winner == 'white'),  # Assuming human is white
-                        game_result=game_result.value
-                    )
-                except Exception as e:
-                    print(f"❌ Error recording RL data: {e}")
+                queue_rl_game(session, game_result)
         
         return {
             "success": True,
@@ -259,31 +349,32 @@ async def get_ai_move(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/session/{session_id}/reset")
-async def reset_session(session_id: str):
+async def reset_session(session_id: str,
+                        session: GameSession = Depends(require_session)):
     """Reset the game session"""
-    session = session_manager.get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     try:
-        session.reset_game()
+        async with session.lock:
+            session.reset_game()
+        
+        game_state = session.to_dict()
         
         # Notify WebSocket clients if this is a multiplayer game
         if session.mode == GameMode.HUMAN_VS_HUMAN:
-            await websocket_manager.broadcast_to_session(session_id, {
+            websocket_manager.enqueue(session_id, {
                 "type": "game_reset",
-                "game_state": session.to_dict()
+                "game_state": game_state
             })
         
         return {
             "success": True,
-            "game_state": session.to_dict()
+            "game_state": game_state
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/session/{session_id}/join")
-async def join_session(session_id: str, request: Request):
+async def join_session(session_id: str, request: Request,
+                       session: GameSession = Depends(require_session)):
     """Join an existing game session"""
     try:
         data = await request.json()
@@ -293,10 +384,6 @@ async def join_session(session_id: str, request: Request):
         if not player_name:
             raise HTTPException(status_code=400, detail="player_name is required")
         
-        session = session_manager.get_session(session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
         # Add player to session
         if color == "white":
             if session.player_white:
@@ -328,19 +415,16 @@ async def join_session(session_id: str, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/session/{session_id}/settings")
-async def update_session_settings(session_id: str, request: Request):
+async def update_session_settings(session_id: str, request: Request,
+                                  session: GameSession = Depends(require_session)):
     """Update session settings (e.g., RL engine toggle)"""
     try:
         data = await request.json()
         use_rl_engine = data.get("use_rl_engine", False)
         
-        session = session_manager.get_session(session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
         # Update RL engine setting and reset engines to ensure clean state
         old_rl_setting = session.use_rl_engine
-        session.use_rl_engine = use_rl_engine
+        session.enable_rl_enhancement(use_rl_engine)
         
         # If RL setting changed, reset the engines to ensure clean initialization
         if old_rl_setting != use_rl_engine:
@@ -451,15 +535,24 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         while True:
             # Receive message from client
             data = await websocket.receive_text()
+            try:
+                message = json.loads(data)
+            except ValueError:
+                await websocket.send_bytes(dumps_message({
+                    "type": "error",
+                    "data": {"message": "Invalid JSON message"}
+                }))
+                continue
             
-            # Handle the message using our modular handler
+            # Handle the message using our modular handler, which replies
+            # and broadcasts itself
             response = await handle_websocket_message(
-                session_id, data, session_manager, invitation_manager
+                session_id, message, websocket, session_manager, websocket_manager
             )
             
-            # Send response back to client
+            # Send any response back to client, as binary frames like the rest
             if response:
-                await websocket.send_text(response)
+                await websocket.send_bytes(dumps_message(response))
                 
     except WebSocketDisconnect:
         websocket_manager.disconnect(websocket)
@@ -469,34 +562,50 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
 
 # ===== ADMIN/STATS ENDPOINTS =====
 
+# Monitoring probes can hit /api/stats every second; its counts (one of
+# them a SQLite query) are reused for STATS_TTL seconds
+STATS_TTL = 1.0
+_stats_cache = (0.0, None)
+
 @app.get("/api/stats")
 async def get_stats():
     """Get server statistics"""
+    global _stats_cache
+    now = time.monotonic()
+    cached_at, stats = _stats_cache
+    if stats is not None and now - cached_at < STATS_TTL:
+        return stats
+    
     session_info = session_manager.get_session_info()
     invitation_count = invitation_manager.get_active_invitation_count()
     
-    return {
+    stats = {
         "sessions": session_info,
         "active_invitations": invitation_count,
-        "websocket_connections": len(websocket_manager.active_connections),
-        "rl_data_entries": rl_data_recorder.get_total_entries()
+        "websocket_connections": websocket_manager.get_connection_count(),
+        "rl_data_entries": await asyncio.to_thread(rl_data_recorder.get_total_entries)
     }
+    _stats_cache = (now, stats)
+    return stats
+
+# The health payload never changes, so it is encoded once
+HEALTH_BODY = DefaultResponse({
+    "status": "healthy",
+    "version": "2.0.0",
+    "features": [
+        "full_chess_rules",
+        "mcts_ai",
+        "rl_enhancement", 
+        "real_time_multiplayer",
+        "invitation_system",
+        "session_management"
+    ]
+}).body
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "version": "2.0.0",
-        "features": [
-            "full_chess_rules",
-            "mcts_ai",
-            "rl_enhancement", 
-            "real_time_multiplayer",
-            "invitation_system",
-            "session_management"
-        ]
-    }
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 # ===== COMPATIBILITY ENDPOINTS (for existing frontend) =====
 
@@ -508,7 +617,6 @@ async def create_session_legacy(request: Request):
         mode_str = data.get("mode", "human_vs_ai")
         use_rl = data.get("use_rl", False)
         
-        session_id = str(uuid.uuid4())
         mode = GameMode.HUMAN_VS_AI if mode_str == "human_vs_ai" else GameMode.HUMAN_VS_HUMAN
         session_id = session_manager.create_session(
             mode=mode,
@@ -572,14 +680,23 @@ async def make_move_legacy(request: Request):
         
         promotion = data.get("promotion")
         
-        success = session.make_move(
-            from_row, from_col, to_row, to_col,
-            promotion.get("type") if promotion else None,
-            promotion.get("piece") if promotion else None
-        )
+        async with session.lock:
+            # Move validation runs in a worker thread, off the event loop
+            success = await asyncio.to_thread(
+                session.make_move,
+                from_row, from_col, to_row, to_col,
+                promotion.get("type") if promotion else None,
+                promotion.get("piece") if promotion else None
+            )
+            
+            if not success:
+                raise HTTPException(status_code=400, detail="Invalid move")
+            
+            # Let the AI start thinking about its reply straight away
+            await session.start_ai_precompute()
         
-        if not success:
-            raise HTTPException(status_code=400, detail="Invalid move")
+        # One snapshot serves both the broadcast and the response
+        game_state = session.to_dict()
         
         # Broadcast move to all connected players via WebSocket
         if session.mode == GameMode.HUMAN_VS_HUMAN:
@@ -589,25 +706,24 @@ async def make_move_legacy(request: Request):
                     "from": [from_row, from_col],
                     "to": [to_row, to_col],
                     "promotion": promotion,
-                    "game_state": session.to_dict(),
+                    "game_state": game_state,
                     "success": True
                 }
             }
-            try:
-                import asyncio
-                loop = asyncio.get_event_loop()
-                loop.create_task(websocket_manager.broadcast_to_session(session_id, move_message))
-            except Exception as e:
-                print(f"⚠️ Failed to broadcast move via WebSocket: {e}")
+            websocket_manager.enqueue(session_id, move_message)
         
         # Check if game is finished
         game_result = session.board.get_game_result()
         if game_result != GameResult.IN_PROGRESS:
             session.finish_game(game_result.value)
+            
+            # Record game data for RL if this was an RL-enhanced session
+            if session.use_rl_engine:
+                queue_rl_game(session, game_result)
         
         return {
             "success": True,
-            "game_state": session.to_dict(),
+            "game_state": game_state,
             "game_result": game_result.value
         }
         
@@ -642,51 +758,59 @@ async def get_ai_move_legacy(request: Request):
             print(f"📋 Available sessions: {list(session_manager.sessions.keys())}")
             raise HTTPException(status_code=404, detail="Session not found")
         
-        print(f"✅ Found session: {session_id}")
-        print(f"🎯 Current player: {session.board.current_player}")
-        print(f"🎮 Game mode: {session.mode}")
-        legal_moves = session.board.get_all_legal_moves()
-        print(f"📝 Legal moves count: {len(legal_moves)}")
-        
-        ai_move = session.get_ai_move()
-        print(f"🤖 AI move result: {ai_move}")
-        print(f"🔍 AI move type: {type(ai_move)}")
-        print(f"🔍 AI move truthy: {bool(ai_move)}")
-        
-        if not ai_move:
-            raise HTTPException(status_code=400, detail="No AI move available")
-        
-        print(f"🔧 AI move validation - Length: {len(ai_move) if hasattr(ai_move, '__len__') else 'N/A'}")
-        
-        # Actually execute the AI move on the board
-        try:
-            # Handle both tuple and dictionary formats
-            if isinstance(ai_move, dict):
-                # Dictionary format: {'from': [3, 3], 'to': [4, 3], ...}
-                from_pos = ai_move['from']
-                to_pos = ai_move['to']
-                move_success = session.make_move(from_pos[0], from_pos[1], to_pos[0], to_pos[1])
-                print(f"🎯 Dictionary format move execution result: {move_success}")
-            else:
-                # Tuple format: (from_row, from_col, to_row, to_col)
-                move_success = session.make_move(ai_move[0], ai_move[1], ai_move[2], ai_move[3])
-                print(f"🎯 Tuple format move execution result: {move_success}")
-        except (IndexError, KeyError, TypeError) as e:
-            print(f"❌ Error accessing AI move: {e}")
-            print(f"🔍 AI move details: {ai_move}")
+        async with session.lock:
+            print(f"✅ Found session: {session_id}")
+            print(f"🎯 Current player: {session.board.current_player}")
+            print(f"🎮 Game mode: {session.mode}")
+            legal_moves = session.board.get_all_legal_moves()
+            print(f"📝 Legal moves count: {len(legal_moves)}")
+            
+            ai_move = await gated_ai_move(session)
+            print(f"🤖 AI move result: {ai_move}")
             print(f"🔍 AI move type: {type(ai_move)}")
-            raise HTTPException(status_code=500, detail=f"Invalid AI move format: {ai_move}")
-        except Exception as e:
-            print(f"❌ Error executing AI move: {e}")
-            raise HTTPException(status_code=500, detail=f"Move execution failed: {str(e)}")
-        
-        if not move_success:
-            raise HTTPException(status_code=500, detail="Failed to execute AI move")
+            print(f"🔍 AI move truthy: {bool(ai_move)}")
+            
+            if not ai_move:
+                raise HTTPException(status_code=400, detail="No AI move available")
+            
+            print(f"🔧 AI move validation - Length: {len(ai_move) if hasattr(ai_move, '__len__') else 'N/A'}")
+            
+            # Actually execute the AI move on the board
+            try:
+                # Handle both tuple and dictionary formats
+                if isinstance(ai_move, dict):
+                    # Dictionary format: {'from': [3, 3], 'to': [4, 3], ...}
+                    from_pos = ai_move['from']
+                    to_pos = ai_move['to']
+                    move_success = await asyncio.to_thread(
+                        session.make_move, from_pos[0], from_pos[1], to_pos[0], to_pos[1])
+                    print(f"🎯 Dictionary format move execution result: {move_success}")
+                else:
+                    # Tuple format: (from_row, from_col, to_row, to_col)
+                    move_success = await asyncio.to_thread(
+                        session.make_move, ai_move[0], ai_move[1], ai_move[2], ai_move[3])
+                    print(f"🎯 Tuple format move execution result: {move_success}")
+            except (IndexError, KeyError, TypeError) as e:
+                print(f"❌ Error accessing AI move: {e}")
+                print(f"🔍 AI move details: {ai_move}")
+                print(f"🔍 AI move type: {type(ai_move)}")
+                raise HTTPException(status_code=500, detail=f"Invalid AI move format: {ai_move}")
+            except Exception as e:
+                print(f"❌ Error executing AI move: {e}")
+                raise HTTPException(status_code=500, detail=f"Move execution failed: {str(e)}")
+            
+            if not move_success:
+                raise HTTPException(status_code=500, detail="Failed to execute AI move")
+            
+            # Check if game is finished after AI move
+            game_result = session.board.get_game_result()
         
-        # Check if game is finished after AI move
-        game_result = session.board.get_game_result()
         if game_result != GameResult.IN_PROGRESS:
             session.finish_game(game_result.value)
+            
+            # Record game data for RL
+            if session.use_rl_engine:
+                queue_rl_game(session, game_result)
         
         return {
             "success": True,
@@ -727,7 +851,8 @@ async def reset_game_legacy(request: Request):
             raise HTTPException(status_code=404, detail="Session not found")
         
         print(f"✅ Resetting session: {session_id}")
-        session.reset_game()
+        async with session.lock:
+            session.reset_game()
         print(f"🎯 Reset completed successfully")
         
         return {
@@ -1,11 +1,12 @@
 """
 Chess board implementation with full chess rules and evaluation.
 """
-import copy
 import json
+import random
+from collections import Counter
 from enum import Enum
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
 
 
 class Color(Enum):
@@ -34,40 +35,347 @@ class GameResult(Enum):
     DRAW = "draw"
 
 
+# Move offsets as (row, col) steps, shared instead of rebuilt on every call
+_ROOK_DIRS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+_BISHOP_DIRS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+_QUEEN_DIRS = _ROOK_DIRS + _BISHOP_DIRS
+_KNIGHT_OFFSETS = ((2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2))
+_KING_OFFSETS = _QUEEN_DIRS
+_PAWN_CAPTURE_COLS = (-1, 1)
+
+# Small integer codes used on the hot path.  The enums above stay the public
+# API types; 0 is reserved for an empty square.
+EMPTY = 0
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+WHITE, BLACK = 0, 1
+
+PIECE_INDEX = {
+    PieceType.PAWN: PAWN, PieceType.KNIGHT: KNIGHT, PieceType.BISHOP: BISHOP,
+    PieceType.ROOK: ROOK, PieceType.QUEEN: QUEEN, PieceType.KING: KING
+}
+COLOR_INDEX = {Color.WHITE: WHITE, Color.BLACK: BLACK}
+
+# Material value in pawns of each piece code, for calculate_material_balance
+MATERIAL_VALUES = (0, 1, 3, 3, 5, 9, 0)
+
+# Bitboard of the dark squares (a1, c1, ..., h8): row + col is odd
+DARK_SQUARES = sum(1 << (row * 8 + col) for row in range(8) for col in range(8)
+                   if (row + col) & 1)
+
+
+def _step_mask(sq: int, offsets) -> int:
+    """Bitboard of the on-board squares one (row, col) offset away from sq"""
+    row, col = divmod(sq, 8)
+    mask = 0
+    for dr, dc in offsets:
+        r, c = row + dr, col + dc
+        if 0 <= r < 8 and 0 <= c < 8:
+            mask |= 1 << (r * 8 + c)
+    return mask
+
+
+def _ray_mask(sq: int, dr: int, dc: int) -> int:
+    """Bitboard of every square from sq (exclusive) to the edge in one direction"""
+    row, col = divmod(sq, 8)
+    mask = 0
+    r, c = row + dr, col + dc
+    while 0 <= r < 8 and 0 <= c < 8:
+        mask |= 1 << (r * 8 + c)
+        r, c = r + dr, c + dc
+    return mask
+
+
+# Attack tables indexed by square.  PAWN_ATTACKS[side][sq] holds the squares a
+# pawn of that side standing on sq attacks (white pawns move towards row 0).
+KNIGHT_ATTACKS = tuple(_step_mask(sq, _KNIGHT_OFFSETS) for sq in range(64))
+KING_ATTACKS = tuple(_step_mask(sq, _KING_OFFSETS) for sq in range(64))
+PAWN_ATTACKS = (
+    tuple(_step_mask(sq, tuple((-1, dc) for dc in _PAWN_CAPTURE_COLS)) for sq in range(64)),
+    tuple(_step_mask(sq, tuple((1, dc) for dc in _PAWN_CAPTURE_COLS)) for sq in range(64)),
+)
+# Square a pawn of each side on sq advances to, and the square of its double
+# step from the starting row (0 elsewhere).  No pawn stands on the last row.
+PAWN_PUSHES = (
+    tuple(1 << (sq - 8) if sq >= 8 else 0 for sq in range(64)),
+    tuple(1 << (sq + 8) if sq < 56 else 0 for sq in range(64)),
+)
+PAWN_DOUBLE_PUSHES = (
+    tuple(1 << (sq - 16) if sq >> 3 == 6 else 0 for sq in range(64)),
+    tuple(1 << (sq + 16) if sq >> 3 == 1 else 0 for sq in range(64)),
+)
+
+# Rays per direction.  "Positive" directions run towards higher square
+# indices, so the nearest blocker is the lowest set bit; "negative" ones use
+# the highest set bit.
+_ROOK_RAYS_POSITIVE = tuple(tuple(_ray_mask(sq, dr, dc) for sq in range(64))
+                            for dr, dc in ((0, 1), (1, 0)))
+_ROOK_RAYS_NEGATIVE = tuple(tuple(_ray_mask(sq, dr, dc) for sq in range(64))
+                            for dr, dc in ((0, -1), (-1, 0)))
+_BISHOP_RAYS_POSITIVE = tuple(tuple(_ray_mask(sq, dr, dc) for sq in range(64))
+                              for dr, dc in ((1, 1), (1, -1)))
+_BISHOP_RAYS_NEGATIVE = tuple(tuple(_ray_mask(sq, dr, dc) for sq in range(64))
+                              for dr, dc in ((-1, 1), (-1, -1)))
+
+
+def _slider_attacks(sq: int, occupied: int, positive_rays, negative_rays) -> int:
+    """Attacks along the given rays, each stopping at (and including) its first blocker"""
+    attacks = 0
+    for rays in positive_rays:
+        ray = rays[sq]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for rays in negative_rays:
+        ray = rays[sq]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+
+def _line_tables(positive_rays, negative_rays):
+    """Per-square relevant-occupancy masks and {occupancy: attacks} tables for one line
+
+    The relevant occupancy is the line through sq minus sq itself and minus the
+    farthest square of each ray, since a blocker on the edge never shortens it.
+    """
+    masks = []
+    tables = []
+    for sq in range(64):
+        positive = positive_rays[sq]
+        negative = negative_rays[sq]
+        mask = negative & (negative - 1)
+        if positive:
+            mask |= positive ^ (1 << (positive.bit_length() - 1))
+        table = {}
+        subset = 0
+        while True:
+            table[subset] = _slider_attacks(sq, subset, (positive_rays,), (negative_rays,))
+            subset = (subset - mask) & mask
+            if subset == 0:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return tuple(masks), tuple(tables)
+
+
+# Sliding attack lookups, one table per line through each square (the
+# hash-table variant of kindergarten bitboards).  Ranks are indexed directly
+# by the six inner bits of the rank; files and diagonals are dicts keyed by
+# the masked occupancy of the line.
+RANK_ATTACKS = tuple(_slider_attacks(sq, inner << ((sq & 56) + 1),
+                                     (_ROOK_RAYS_POSITIVE[0],), (_ROOK_RAYS_NEGATIVE[0],))
+                     for sq in range(64) for inner in range(64))
+FILE_MASKS, FILE_ATTACKS = _line_tables(_ROOK_RAYS_POSITIVE[1], _ROOK_RAYS_NEGATIVE[1])
+DIAGONAL_MASKS, DIAGONAL_ATTACKS = _line_tables(_BISHOP_RAYS_POSITIVE[0],
+                                                _BISHOP_RAYS_NEGATIVE[1])
+ANTI_DIAGONAL_MASKS, ANTI_DIAGONAL_ATTACKS = _line_tables(_BISHOP_RAYS_POSITIVE[1],
+                                                          _BISHOP_RAYS_NEGATIVE[0])
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    """Squares a rook on sq attacks given the occupancy bitboard"""
+    return (RANK_ATTACKS[(sq << 6) | ((occupied >> ((sq & 56) + 1)) & 63)] |
+            FILE_ATTACKS[sq][occupied & FILE_MASKS[sq]])
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    """Squares a bishop on sq attacks given the occupancy bitboard"""
+    return (DIAGONAL_ATTACKS[sq][occupied & DIAGONAL_MASKS[sq]] |
+            ANTI_DIAGONAL_ATTACKS[sq][occupied & ANTI_DIAGONAL_MASKS[sq]])
+
+
+def _squares(bb: int) -> List[Tuple[int, int]]:
+    """(row, col) of every set bit, lowest square first"""
+    squares = []
+    while bb:
+        sq = (bb & -bb).bit_length() - 1
+        squares.append((sq >> 3, sq & 7))
+        bb &= bb - 1
+    return squares
+
+
+# Every (from_row, from_col, to_row, to_col) move tuple, indexed by
+# (from_sq << 6) | to_sq.  Move generation hands out these shared tuples
+# instead of building a new one per move.
+MOVES = tuple((from_sq >> 3, from_sq & 7, to_sq >> 3, to_sq & 7)
+              for from_sq in range(64) for to_sq in range(64))
+
+
+def _line_and_between_tables():
+    """Flat 64x64 tables indexed by (a << 6) | b for every pair of squares
+
+    LINE holds the whole line through a and b (edge to edge, both included)
+    and BETWEEN the squares strictly between them; both are 0 when a and b
+    don't share a rank, file or diagonal.
+    """
+    line = [0] * 4096
+    between = [0] * 4096
+    for a in range(64):
+        row, col = divmod(a, 8)
+        for dr, dc in _QUEEN_DIRS:
+            full_line = _ray_mask(a, dr, dc) | _ray_mask(a, -dr, -dc) | (1 << a)
+            path = 0
+            r, c = row + dr, col + dc
+            while 0 <= r < 8 and 0 <= c < 8:
+                b = r * 8 + c
+                line[(a << 6) | b] = full_line
+                between[(a << 6) | b] = path
+                path |= 1 << b
+                r, c = r + dr, c + dc
+    return tuple(line), tuple(between)
+
+
+LINE, BETWEEN = _line_and_between_tables()
+
+# Castling rights packed into four bits
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+ALL_CASTLING = 15
+KINGSIDE_RIGHTS = (WHITE_KINGSIDE, BLACK_KINGSIDE)
+QUEENSIDE_RIGHTS = (WHITE_QUEENSIDE, BLACK_QUEENSIDE)
+# FEN castling letters in their standard order
+_FEN_CASTLING = (('K', WHITE_KINGSIDE), ('Q', WHITE_QUEENSIDE),
+                 ('k', BLACK_KINGSIDE), ('q', BLACK_QUEENSIDE))
+# Home squares of the king and rook each castling right needs, as
+# (right, color, king square, rook square)
+_CASTLING_HOMES = ((WHITE_KINGSIDE, Color.WHITE, (7, 4), (7, 7)),
+                   (WHITE_QUEENSIDE, Color.WHITE, (7, 4), (7, 0)),
+                   (BLACK_KINGSIDE, Color.BLACK, (0, 4), (0, 7)),
+                   (BLACK_QUEENSIDE, Color.BLACK, (0, 4), (0, 0)))
+
+# Rights that survive a move touching each square: moving a king, or moving a
+# rook from (or capturing one on) its home square, clears the matching bits
+CASTLING_UPDATE = [ALL_CASTLING] * 64
+CASTLING_UPDATE[7 * 8 + 4] = ALL_CASTLING & ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_UPDATE[7 * 8 + 7] = ALL_CASTLING & ~WHITE_KINGSIDE
+CASTLING_UPDATE[7 * 8 + 0] = ALL_CASTLING & ~WHITE_QUEENSIDE
+CASTLING_UPDATE[0 * 8 + 4] = ALL_CASTLING & ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_UPDATE[0 * 8 + 7] = ALL_CASTLING & ~BLACK_KINGSIDE
+CASTLING_UPDATE[0 * 8 + 0] = ALL_CASTLING & ~BLACK_QUEENSIDE
+CASTLING_UPDATE = tuple(CASTLING_UPDATE)
+
+# Squares that must be empty for castling, per (row of the king, target col)
+CASTLING_PATHS = {
+    (row, 6): (1 << (row * 8 + 5)) | (1 << (row * 8 + 6)) for row in (0, 7)
+}
+CASTLING_PATHS.update({
+    (row, 2): (1 << (row * 8 + 1)) | (1 << (row * 8 + 2)) | (1 << (row * 8 + 3)) for row in (0, 7)
+})
+
+# Entries kept in a board's check/mate/legal-move memo before it is cleared
+STATUS_CACHE_SIZE = 50000
+
+# Zobrist keys: one random 64-bit number per (side, piece code, square), plus
+# keys for the side to move, each castling right and the en passant file.
+# A fixed seed keeps hashes stable across processes.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_PIECES = [[[_zobrist_rng.getrandbits(64) for _ in range(64)] for _ in range(7)]
+                  for _ in range(2)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+_castling_keys = [_zobrist_rng.getrandbits(64) for _ in range(4)]
+ZOBRIST_CASTLING = tuple(
+    _castling_keys[0] * (rights & 1) ^ _castling_keys[1] * (rights >> 1 & 1) ^
+    _castling_keys[2] * (rights >> 2 & 1) ^ _castling_keys[3] * (rights >> 3 & 1)
+    for rights in range(16)
+)
+ZOBRIST_EN_PASSANT = [_zobrist_rng.getrandbits(64) for _ in range(8)]
+
+
 @dataclass
 class Piece:
     type: PieceType
     color: Color
     has_moved: bool = False
+    # Integer mirrors of type/color for cheap comparisons in move generation
+    kind: int = field(init=False, repr=False, compare=False)
+    side: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.kind = PIECE_INDEX[self.type]
+        self.side = COLOR_INDEX[self.color]
     
     def copy(self):
         return Piece(self.type, self.color, self.has_moved)
 
 
+# Shared has_moved pieces, indexed [side][kind], handed out whenever a piece
+# moves for the first time or a pawn promotes instead of building new ones.
+# Pieces are never mutated, so boards can share them.
+MOVED_PIECES = tuple(
+    (None,) + tuple(Piece(piece_type, color, True)
+                    for piece_type in sorted(PIECE_INDEX, key=PIECE_INDEX.get))
+    for color in sorted(COLOR_INDEX, key=COLOR_INDEX.get))
+
+# Promotion piece letter -> piece code
+PROMOTION_KINDS = {'Q': QUEEN, 'R': ROOK, 'B': BISHOP, 'N': KNIGHT}
+
+# JSON form of every piece for to_dict, indexed [side][kind][has_moved].
+# Shared by all boards and responses, so never modify them.
+_PIECE_DICTS = tuple(
+    (None,) + tuple(
+        tuple({'type': piece_type.value, 'color': color.value, 'has_moved': has_moved}
+              for has_moved in (False, True))
+        for piece_type in sorted(PIECE_INDEX, key=PIECE_INDEX.get))
+    for color in sorted(COLOR_INDEX, key=COLOR_INDEX.get))
+
+
 class ChessBoard:
     """Enhanced chess board with full rules implementation"""
     
     def __init__(self):
-        self.board = [[None for _ in range(8)] for _ in range(8)]
+        # Piece on each square, indexed row * 8 + col (row 0 is the eighth rank)
+        self.board = [None] * 64
+        # Square-indexed mailbox of piece codes mirroring self.board: +kind
+        # for white, -kind for black, EMPTY for an empty square
+        self.squares = [EMPTY] * 64
+        # Square-indexed JSON form of each piece (see _PIECE_DICTS), so
+        # to_dict never builds per-square dicts
+        self._piece_cache = [None] * 64
         self.current_player = Color.WHITE
+        # current_player as WHITE/BLACK, for the move generation hot paths
+        self.side_to_move = WHITE
         self.kings = {Color.WHITE: (7, 4), Color.BLACK: (0, 4)}
-        self.castling_rights = {
-            Color.WHITE: {"kingside": True, "queenside": True},
-            Color.BLACK: {"kingside": True, "queenside": True}
-        }
+        # Castling rights as a WHITE_KINGSIDE | ... bit set
+        self.castling = ALL_CASTLING
         self.en_passant_target = None
         self.halfmove_clock = 0
         self.fullmove_number = 1
         self.move_history = []
-        self.position_history = []
+        # One bitboard per color and piece type, indexed as
+        # bitboards[WHITE][PAWN]; bit (row * 8 + col) is set when that piece
+        # occupies the square.  Kept in sync with self.board.
+        self.bitboards = [[0] * 7, [0] * 7]
+        # Union of each side's bitboards
+        self.occupied = [0, 0]
+        # Material total per side (MATERIAL_VALUES), updated as pieces are
+        # placed and removed so captures and promotions keep it current
+        self.material = [0, 0]
+        # Incremental Zobrist hash of the position, updated as pieces move
+        self.zobrist = 0
         self._setup_initial_position()
+        self.zobrist ^= self._state_hash()
+        # Zobrist keys of positions since the last irreversible move
+        self._position_history = [self.zobrist]
+        self._position_counts = Counter(self._position_history)
+        # Zobrist key -> [in check, has no legal move, legal moves as a tuple]
+        # for the side to move, the last two None until computed.  Shared
+        # between copies, since they only depend on the position the key
+        # identifies.
+        self._status_cache = {}
+        # One record per make_move, popped by unmake_move
+        self._undo_stack = []
+        # (to_dict state, legal moves) for the current position; cleared
+        # whenever a move is made or unmade
+        self._dict_cache = None
     
     def _setup_initial_position(self):
         """Set up the standard chess starting position"""
         # Place pawns
         for col in range(8):
-            self.board[1][col] = Piece(PieceType.PAWN, Color.BLACK)
-            self.board[6][col] = Piece(PieceType.PAWN, Color.WHITE)
+            self._place_piece(1, col, Piece(PieceType.PAWN, Color.BLACK))
+            self._place_piece(6, col, Piece(PieceType.PAWN, Color.WHITE))
         
         # Place other pieces
         piece_order = [PieceType.ROOK, PieceType.KNIGHT, PieceType.BISHOP, 
@@ -75,358 +383,821 @@ class ChessBoard:
                       PieceType.KNIGHT, PieceType.ROOK]
         
         for col, piece_type in enumerate(piece_order):
-            self.board[0][col] = Piece(piece_type, Color.BLACK)
-            self.board[7][col] = Piece(piece_type, Color.WHITE)
+            self._place_piece(0, col, Piece(piece_type, Color.BLACK))
+            self._place_piece(7, col, Piece(piece_type, Color.WHITE))
+    
+    def _place_piece(self, row: int, col: int, piece: Piece):
+        """Put a piece on an empty square, updating its bitboard"""
+        sq = row * 8 + col
+        self.board[sq] = piece
+        self.squares[sq] = -piece.kind if piece.side else piece.kind
+        self._piece_cache[sq] = _PIECE_DICTS[piece.side][piece.kind][piece.has_moved]
+        self.bitboards[piece.side][piece.kind] |= 1 << sq
+        self.occupied[piece.side] |= 1 << sq
+        self.material[piece.side] += MATERIAL_VALUES[piece.kind]
+        self.zobrist ^= ZOBRIST_PIECES[piece.side][piece.kind][sq]
+    
+    def _remove_piece(self, row: int, col: int) -> Optional[Piece]:
+        """Clear a square, updating the bitboard of the piece that was on it"""
+        sq = row * 8 + col
+        piece = self.board[sq]
+        if piece:
+            self.board[sq] = None
+            self.squares[sq] = EMPTY
+            self._piece_cache[sq] = None
+            self.bitboards[piece.side][piece.kind] ^= 1 << sq
+            self.occupied[piece.side] ^= 1 << sq
+            self.material[piece.side] -= MATERIAL_VALUES[piece.kind]
+            self.zobrist ^= ZOBRIST_PIECES[piece.side][piece.kind][sq]
+        return piece
+    
+    def _state_hash(self) -> int:
+        """Zobrist contribution of side to move, castling rights and en passant"""
+        key = ZOBRIST_BLACK_TO_MOVE if self.side_to_move else 0
+        key ^= ZOBRIST_CASTLING[self.castling]
+        if self.en_passant_target:
+            # Only hash the en passant file when a pawn could actually capture
+            # (the capturing pawns stand where an enemy pawn on the target
+            # square would attack, so the attack table replaces bounds checks)
+            ep_row, ep_col = self.en_passant_target
+            side = self.side_to_move
+            if self.bitboards[side][PAWN] & PAWN_ATTACKS[side ^ 1][ep_row * 8 + ep_col]:
+                key ^= ZOBRIST_EN_PASSANT[ep_col]
+        return key
+    
+    @property
+    def castling_rights(self) -> Dict[Color, Dict[str, bool]]:
+        """Castling rights as {color: {"kingside": bool, "queenside": bool}}"""
+        return {
+            color: {
+                "kingside": bool(self.castling & KINGSIDE_RIGHTS[side]),
+                "queenside": bool(self.castling & QUEENSIDE_RIGHTS[side])
+            }
+            for color, side in COLOR_INDEX.items()
+        }
+    
+    # Piece counts come straight from the occupancy bitboards, which make_move
+    # and unmake_move already keep current, so no separate counter can drift
+    @property
+    def piece_count(self) -> int:
+        """Number of pieces on the board, kings included"""
+        return (self.occupied[WHITE] | self.occupied[BLACK]).bit_count()
+    
+    @property
+    def white_piece_count(self) -> int:
+        """Number of white pieces on the board"""
+        return self.occupied[WHITE].bit_count()
+    
+    @property
+    def black_piece_count(self) -> int:
+        """Number of black pieces on the board"""
+        return self.occupied[BLACK].bit_count()
     
     def copy(self):
-        """Create a deep copy of the chess board"""
-        new_board = ChessBoard()
-        new_board.board = [[piece.copy() if piece else None for piece in row] for row in self.board]
+        """Create an independent copy of the chess board
+        
+        The square list is copied but Piece objects are shared: moves never mutate a
+        piece in place (see _make_move_unchecked), so sharing is safe.  The
+        copy starts with an empty undo stack: unmake_move only takes back
+        moves made on the copy itself.
+        """
+        new_board = ChessBoard.__new__(ChessBoard)
+        new_board.board = self.board[:]
+        new_board.squares = self.squares[:]
+        new_board._piece_cache = self._piece_cache[:]
         new_board.current_player = self.current_player
+        new_board.side_to_move = self.side_to_move
         new_board.kings = self.kings.copy()
-        new_board.castling_rights = copy.deepcopy(self.castling_rights)
+        new_board.castling = self.castling
         new_board.en_passant_target = self.en_passant_target
         new_board.halfmove_clock = self.halfmove_clock
         new_board.fullmove_number = self.fullmove_number
         new_board.move_history = self.move_history.copy()
-        new_board.position_history = self.position_history.copy()
+        new_board.bitboards = [self.bitboards[WHITE][:], self.bitboards[BLACK][:]]
+        new_board.occupied = self.occupied[:]
+        new_board.material = self.material[:]
+        new_board.zobrist = self.zobrist
+        new_board._position_history = self._position_history.copy()
+        new_board._position_counts = self._position_counts.copy()
+        new_board._status_cache = self._status_cache
+        new_board._undo_stack = []
+        new_board._dict_cache = None
         return new_board
+    
+    def to_fen(self) -> str:
+        """Forsyth-Edwards Notation for the position"""
+        rows = []
+        for row in range(8):
+            fen_row = ''
+            empty = 0
+            for piece in self.board[row * 8:row * 8 + 8]:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    fen_row += str(empty)
+                    empty = 0
+                letter = piece.type.value
+                fen_row += letter if piece.color == Color.WHITE else letter.lower()
+            if empty:
+                fen_row += str(empty)
+            rows.append(fen_row)
+        
+        castling = ''.join(letter for letter, right in _FEN_CASTLING if self.castling & right)
+        if self.en_passant_target:
+            ep_row, ep_col = self.en_passant_target
+            en_passant = f"{chr(97 + ep_col)}{8 - ep_row}"
+        else:
+            en_passant = '-'
+        side = 'w' if self.current_player == Color.WHITE else 'b'
+        return (f"{'/'.join(rows)} {side} {castling or '-'} {en_passant} "
+                f"{self.halfmove_clock} {self.fullmove_number}")
+    
+    @classmethod
+    def from_fen(cls, fen: str, history: Optional[Sequence[int]] = None) -> 'ChessBoard':
+        """Build a board from Forsyth-Edwards Notation
+        
+        FEN carries no game history, so the board starts with an empty move
+        history and, unless history is given, an empty repetition record.
+        history is the repetition_history() of the board the FEN came from,
+        so repetitions involving earlier positions of the game still count.
+        has_moved is inferred: a piece counts as unmoved on its starting
+        square (kings and rooks only while the matching castling right
+        remains).  Castling rights whose king or rook is not on its home
+        square are dropped.
+        """
+        fields = fen.split()
+        if len(fields) == 4:
+            fields += ['0', '1']
+        if len(fields) != 6:
+            raise ValueError(f"Invalid FEN: {fen!r}")
+        placement, side, castling, en_passant, halfmove, fullmove = fields
+        rows = placement.split('/')
+        if len(rows) != 8 or side not in ('w', 'b'):
+            raise ValueError(f"Invalid FEN: {fen!r}")
+        
+        board = cls()
+        # Clear the starting position; the zobrist key is rebuilt below
+        for sq in range(64):
+            board._remove_piece(sq >> 3, sq & 7)
+        board.zobrist = 0
+        
+        board.castling = 0
+        for letter, right in _FEN_CASTLING:
+            if letter in castling:
+                board.castling |= right
+        
+        piece_types = {piece_type.value: piece_type for piece_type in PieceType}
+        pieces = {}  # (row, col) -> (piece type, color)
+        for row, fen_row in enumerate(rows):
+            col = 0
+            for char in fen_row:
+                if char.isdigit():
+                    col += int(char)
+                    continue
+                piece_type = piece_types.get(char.upper())
+                if piece_type is None or col > 7:
+                    raise ValueError(f"Invalid FEN: {fen!r}")
+                pieces[(row, col)] = (piece_type, Color.WHITE if char.isupper() else Color.BLACK)
+                col += 1
+            if col != 8:
+                raise ValueError(f"Invalid FEN: {fen!r}")
+        
+        # A right only stands while its king and rook are on their home squares
+        for right, color, king_square, rook_square in _CASTLING_HOMES:
+            if (pieces.get(king_square) != (PieceType.KING, color)
+                    or pieces.get(rook_square) != (PieceType.ROOK, color)):
+                board.castling &= ~right
+        
+        for (row, col), (piece_type, color) in pieces.items():
+            piece = Piece(piece_type, color, board._fen_has_moved(piece_type, color, row, col))
+            board._place_piece(row, col, piece)
+            if piece_type == PieceType.KING:
+                board.kings[color] = (row, col)
+        
+        board.current_player = Color.WHITE if side == 'w' else Color.BLACK
+        board.side_to_move = COLOR_INDEX[board.current_player]
+        if en_passant != '-':
+            board.en_passant_target = (8 - int(en_passant[1]), ord(en_passant[0]) - 97)
+        board.halfmove_clock = int(halfmove)
+        board.fullmove_number = int(fullmove)
+        board.move_history = []
+        
+        board.zobrist ^= board._state_hash()
+        # A history that does not end in this position belongs to another game
+        if history and history[-1] == board.zobrist:
+            board._position_history = list(history)
+        else:
+            board._position_history = [board.zobrist]
+        board._position_counts = Counter(board._position_history)
+        board._dict_cache = None
+        return board
+    
+    def repetition_history(self) -> Tuple[int, ...]:
+        """Zobrist keys of the positions since the last capture or pawn move
+        
+        Oldest first, ending with the current position; from_fen takes it to
+        carry the repetition record over to a board rebuilt from FEN.
+        """
+        return tuple(self._position_history)
+    
+    def _fen_has_moved(self, piece_type: PieceType, color: Color, row: int, col: int) -> bool:
+        """Best guess at has_moved for a piece read from FEN (castling already set)"""
+        side = COLOR_INDEX[color]
+        home_row = 7 if color == Color.WHITE else 0
+        if piece_type == PieceType.PAWN:
+            return row != (6 if color == Color.WHITE else 1)
+        if row != home_row:
+            return True
+        if piece_type == PieceType.KING:
+            return not (col == 4 and self.castling & (KINGSIDE_RIGHTS[side] | QUEENSIDE_RIGHTS[side]))
+        if piece_type == PieceType.ROOK:
+            if col == 7:
+                return not self.castling & KINGSIDE_RIGHTS[side]
+            if col == 0:
+                return not self.castling & QUEENSIDE_RIGHTS[side]
+            return True
+        home_cols = {PieceType.KNIGHT: (1, 6), PieceType.BISHOP: (2, 5), PieceType.QUEEN: (3,)}
+        return col not in home_cols[piece_type]
 
     def get_piece_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
         """Get all legal moves for a piece at the given position"""
-        piece = self.board[row][col]
+        piece = self.board[row * 8 + col]
         if not piece or piece.color != self.current_player:
             return []
         
-        # Get raw moves (without legality checks)
-        moves = self._get_raw_piece_moves(row, col)
+        # Get pseudo-legal moves (without legality checks)
+        moves = self._get_pseudo_legal_moves(row, col)
         
         # Add castling moves for kings
-        if piece.type == PieceType.KING:
+        if piece.kind == KING:
             moves.extend(self._get_castling_moves(row, col))
         
         # Filter out moves that would put own king in check
+        pins = self._checkers_and_pins()
         legal_moves = []
         for to_row, to_col in moves:
-            if self._is_legal_move(row, col, to_row, to_col):
+            if self._is_legal_move(row, col, to_row, to_col, pins):
                 legal_moves.append((to_row, to_col))
         
         return legal_moves
     
     def get_all_legal_moves(self) -> List[Tuple[int, int, int, int]]:
-        """Get all legal moves for the current player"""
-        legal_moves = []
+        """Get all legal moves for the current player
         
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and piece.color == self.current_player:
-                    piece_moves = self.get_piece_moves(row, col)
-                    for to_row, to_col in piece_moves:
-                        legal_moves.append((row, col, to_row, to_col))
+        Generated once per position (see _position_status); each call returns
+        a fresh list the caller may change.
+        """
+        status = self._position_status()
+        moves = status[2]
+        if moves is None:
+            moves = status[2] = tuple(self._iter_legal_moves())
+            status[1] = not moves
+        return list(moves)
+    
+    def perft(self, depth: int) -> int:
+        """Number of move sequences of the given length from this position
         
-        return legal_moves
+        The standard move generator check.  Leaf moves are counted from the
+        move list rather than made and taken back.  Promotions count once,
+        as make_move promotes to a single piece.
+        """
+        if depth <= 0:
+            return 1
+        moves = self.get_all_legal_moves()
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self.make_legal_move(*move)
+            nodes += self.perft(depth - 1)
+            self.unmake_move()
+        return nodes
     
-    def _get_raw_piece_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get raw moves for a piece (without checking for legality)"""
-        piece = self.board[row][col]
-        if not piece:
+    def has_any_legal_move(self) -> bool:
+        """Check whether the current player has at least one legal move"""
+        return not self._has_no_legal_moves()
+    
+    def _iter_legal_moves(self) -> Iterator[Tuple[int, int, int, int]]:
+        """Yield legal moves for the current player, one piece at a time"""
+        side = self.side_to_move
+        pins = self._checkers_and_pins()
+        _, checkers, pinned = pins
+        # Out of check, every pseudo-legal move of an unpinned piece other
+        # than the king is legal, so only en passant (when available) still
+        # needs the per-move test; skipping the call keeps the loop cheap
+        unchecked = ~pinned if not checkers else 0
+        has_en_passant = self.en_passant_target is not None
+        squares = self.squares
+        is_legal_move = self._is_legal_move
+        # In double check only the king can move
+        own = self.bitboards[side][KING] if checkers & (checkers - 1) else self.occupied[side]
+        while own:
+            sq = (own & -own).bit_length() - 1
+            own &= own - 1
+            kind = abs(squares[sq])
+            targets = _MOVE_TARGETS[kind](self, sq, side)
+            # Moves are the shared MOVES tuples, found by from/to square
+            base = sq << 6
+            if kind == KING:
+                for to_row, to_col in self._get_castling_moves(sq >> 3, sq & 7):
+                    targets |= 1 << (to_row * 8 + to_col)
+            elif unchecked >> sq & 1 and not (kind == PAWN and has_en_passant):
+                while targets:
+                    to_sq = (targets & -targets).bit_length() - 1
+                    targets &= targets - 1
+                    yield MOVES[base | to_sq]
+                continue
+            while targets:
+                to_sq = (targets & -targets).bit_length() - 1
+                targets &= targets - 1
+                move = MOVES[base | to_sq]
+                if is_legal_move(*move, pins):
+                    yield move
+    
+    def _get_pseudo_legal_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
+        """Get moves for a piece without checking for legality (no castling)"""
+        sq = row * 8 + col
+        code = self.squares[sq]
+        if not code:
             return []
         
-        if piece.type == PieceType.PAWN:
-            return self._get_raw_pawn_moves(row, col)
-        elif piece.type == PieceType.ROOK:
-            return self._get_raw_rook_moves(row, col)
-        elif piece.type == PieceType.KNIGHT:
-            return self._get_raw_knight_moves(row, col)
-        elif piece.type == PieceType.BISHOP:
-            return self._get_raw_bishop_moves(row, col)
-        elif piece.type == PieceType.QUEEN:
-            return self._get_raw_queen_moves(row, col)
-        elif piece.type == PieceType.KING:
-            return self._get_raw_king_moves(row, col)
-        
-        return []
-    
-    def _get_raw_pawn_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get raw pawn moves"""
-        piece = self.board[row][col]
-        moves = []
-        direction = -1 if piece.color == Color.WHITE else 1
-        start_row = 6 if piece.color == Color.WHITE else 1
-        
-        # Forward moves
-        new_row = row + direction
-        if 0 <= new_row < 8 and not self.board[new_row][col]:
-            moves.append((new_row, col))
-            
-            # Double move from starting position
-            if row == start_row and not self.board[new_row + direction][col]:
-                moves.append((new_row + direction, col))
-        
-        # Captures
-        for dc in [-1, 1]:
-            new_col = col + dc
-            if 0 <= new_col < 8 and 0 <= new_row < 8:
-                target = self.board[new_row][new_col]
-                if target and target.color != piece.color:
-                    moves.append((new_row, new_col))
-                # En passant
-                elif self.en_passant_target == (new_row, new_col):
-                    moves.append((new_row, new_col))
+        return _squares(_MOVE_TARGETS[abs(code)](self, sq, BLACK if code < 0 else WHITE))
+    
+    # Pseudo-legal target bitboards for the piece of side on sq (no castling)
+    
+    def _pawn_targets(self, sq: int, side: int) -> int:
+        """Pawn pushes and captures, en passant included"""
+        empty = ~(self.occupied[WHITE] | self.occupied[BLACK])
+        # The double push needs the square in front empty as well
+        targets = PAWN_PUSHES[side][sq] & empty
+        if targets:
+            targets |= PAWN_DOUBLE_PUSHES[side][sq] & empty
         
-        return moves
+        # Captures, including en passant, from the pawn attack table
+        enemy = self.occupied[side ^ 1]
+        if self.en_passant_target:
+            ep_row, ep_col = self.en_passant_target
+            enemy |= 1 << (ep_row * 8 + ep_col)
+        return targets | (PAWN_ATTACKS[side][sq] & enemy)
     
-    def _get_raw_rook_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get raw rook moves"""
-        return self._get_sliding_moves(row, col, [(0, 1), (0, -1), (1, 0), (-1, 0)])
+    def _rook_targets(self, sq: int, side: int) -> int:
+        """Rook moves"""
+        return rook_attacks(sq, self.occupied[WHITE] | self.occupied[BLACK]) & ~self.occupied[side]
     
-    def _get_raw_bishop_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get raw bishop moves"""
-        return self._get_sliding_moves(row, col, [(1, 1), (1, -1), (-1, 1), (-1, -1)])
+    def _bishop_targets(self, sq: int, side: int) -> int:
+        """Bishop moves"""
+        return bishop_attacks(sq, self.occupied[WHITE] | self.occupied[BLACK]) & ~self.occupied[side]
     
-    def _get_raw_queen_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get raw queen moves"""
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-        return self._get_sliding_moves(row, col, directions)
+    def _queen_targets(self, sq: int, side: int) -> int:
+        """Queen moves"""
+        occupied = self.occupied[WHITE] | self.occupied[BLACK]
+        return (rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)) & ~self.occupied[side]
     
-    def _get_raw_knight_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get raw knight moves"""
-        moves = []
-        knight_moves = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
-        
-        for dr, dc in knight_moves:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                target = self.board[new_row][new_col]
-                if not target or target.color != self.board[row][col].color:
-                    moves.append((new_row, new_col))
-        
-        return moves
+    def _knight_targets(self, sq: int, side: int) -> int:
+        """Knight moves"""
+        return KNIGHT_ATTACKS[sq] & ~self.occupied[side]
     
-    def _get_raw_king_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get raw king moves (basic moves only, no castling to avoid recursion)"""
-        moves = []
-        
-        # Only basic king moves (one square in any direction)
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                new_row, new_col = row + dr, col + dc
-                if 0 <= new_row < 8 and 0 <= new_col < 8:
-                    target = self.board[new_row][new_col]
-                    if not target or target.color != self.board[row][col].color:
-                        moves.append((new_row, new_col))
-        
-        return moves
+    def _king_targets(self, sq: int, side: int) -> int:
+        """King moves (one square in any direction; castling is separate)"""
+        return KING_ATTACKS[sq] & ~self.occupied[side]
     
     def _get_castling_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get castling moves for the king (separate from raw moves to avoid recursion)"""
+        """Get castling moves for the king (attacked squares are checked in _is_legal_move)"""
         moves = []
-        piece = self.board[row][col]
+        piece = self.board[row * 8 + col]
         
-        if piece.type != PieceType.KING or piece.has_moved:
+        # The rights are cleared as soon as the king or a rook leaves home
+        if piece.kind != KING or not self.castling:
             return moves
         
+        occupied = self.occupied[WHITE] | self.occupied[BLACK]
+        rooks = self.bitboards[piece.side][ROOK]
+        
         # Kingside castling
-        if self.castling_rights[piece.color]["kingside"]:
-            if (not self.board[row][5] and not self.board[row][6] and
-                self.board[row][7] and self.board[row][7].type == PieceType.ROOK and
-                not self.board[row][7].has_moved):
-                moves.append((row, 6))
+        if (self.castling & KINGSIDE_RIGHTS[piece.side] and
+                not occupied & CASTLING_PATHS[(row, 6)] and
+                rooks >> (row * 8 + 7) & 1):
+            moves.append((row, 6))
         
         # Queenside castling
-        if self.castling_rights[piece.color]["queenside"]:
-            if (not self.board[row][1] and not self.board[row][2] and not self.board[row][3] and
-                self.board[row][0] and self.board[row][0].type == PieceType.ROOK and
-                not self.board[row][0].has_moved):
-                moves.append((row, 2))
+        if (self.castling & QUEENSIDE_RIGHTS[piece.side] and
+                not occupied & CASTLING_PATHS[(row, 2)] and
+                rooks >> (row * 8) & 1):
+            moves.append((row, 2))
         
         return moves
     
-    def _get_sliding_moves(self, row: int, col: int, directions: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        """Get sliding piece moves (rook, bishop, queen)"""
-        moves = []
-        piece = self.board[row][col]
-        
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            while 0 <= new_row < 8 and 0 <= new_col < 8:
-                target = self.board[new_row][new_col]
-                if not target:
-                    moves.append((new_row, new_col))
-                elif target.color != piece.color:
-                    moves.append((new_row, new_col))
-                    break
-                else:
-                    break
-                new_row, new_col = new_row + dr, new_col + dc
+    def is_pseudo_legal(self, from_row: int, from_col: int, to_row: int, to_col: int) -> bool:
+        """Whether a piece of the side to move can make this move, ignoring king safety
         
-        return moves
+        Tests the one move against the moving piece's target bitboard rather
+        than generating and scanning a move list.
+        """
+        from_sq = from_row * 8 + from_col
+        code = self.squares[from_sq]
+        if not code or (code < 0) != (self.side_to_move == BLACK):
+            return False
+        kind = abs(code)
+        if kind == KING and from_row == to_row and abs(to_col - from_col) == 2:
+            return (to_row, to_col) in self._get_castling_moves(from_row, from_col)
+        return bool(_MOVE_TARGETS[kind](self, from_sq, self.side_to_move) >> (to_row * 8 + to_col) & 1)
     
-    def _is_legal_move(self, from_row: int, from_col: int, to_row: int, to_col: int) -> bool:
-        """Check if a move is legal (doesn't leave king in check)"""
-        piece = self.board[from_row][from_col]
+    def _is_legal_move(self, from_row: int, from_col: int, to_row: int, to_col: int,
+                       pins: Optional[Tuple[int, int, int]] = None) -> bool:
+        """Check if a move is legal (doesn't leave king in check)
+        
+        pins is the side to move's _checkers_and_pins(), computed here when
+        not passed in; move generators pass it so it is found once per ply.
+        """
+        from_sq = from_row * 8 + from_col
+        code = self.squares[from_sq]
+        kind = abs(code)
+        side = BLACK if code < 0 else WHITE
         
         # Special validation for castling moves
-        if piece and piece.type == PieceType.KING and abs(to_col - from_col) == 2:
+        if kind == KING and abs(to_col - from_col) == 2:
             # This is a castling move - need special validation
-            # King can't be in check when castling
-            if self.is_in_check(piece.color):
-                return False
-            
-            # Check if squares king passes through are safe
-            start_col = from_col
-            end_col = to_col
-            step = 1 if end_col > start_col else -1
-            
-            for col in range(start_col + step, end_col + step, step):
-                if self._is_square_attacked(from_row, col, piece.color):
+            # King can't castle out of, through or into check.  The rook move
+            # can't expose the king, so no trial move is needed.
+            opponent_side = side ^ 1
+            step = 1 if to_col > from_col else -1
+            for col in (from_col, from_col + step, to_col):
+                if self.is_square_attacked(from_row * 8 + col, opponent_side):
                     return False
+            return True
         
-        # Make a copy and try the move
-        temp_board = self.copy()
-        if temp_board._make_move_unchecked(from_row, from_col, to_row, to_col):
-            return not temp_board.is_in_check(self.current_player)
-        return False
+        # A king step is legal when the destination is not attacked, looking
+        # through the square the king leaves (a slider checking along the
+        # line would otherwise seem blocked by the king itself)
+        if kind == KING and side == self.side_to_move:
+            occupied = (self.occupied[WHITE] | self.occupied[BLACK]) ^ (1 << from_sq)
+            return not self.is_square_attacked(to_row * 8 + to_col, side ^ 1, occupied)
+        
+        # Non-king moves other than en passant, which can uncover a rank
+        # attack on the king through two squares at once, are decided by the
+        # checkers and pins alone
+        if (code and kind != KING and side == self.side_to_move and
+                not (kind == PAWN and self.en_passant_target == (to_row, to_col))):
+            king_sq, checkers, pinned = pins or self._checkers_and_pins()
+            to_sq = to_row * 8 + to_col
+            if checkers:
+                if checkers & (checkers - 1):
+                    # Double check: only the king can move
+                    return False
+                # Single check: the move must capture the checker or block
+                checker_sq = checkers.bit_length() - 1
+                if not (BETWEEN[(king_sq << 6) | checker_sq] | checkers) >> to_sq & 1:
+                    return False
+            # A pinned piece may only move along the line through its king
+            if pinned >> from_sq & 1:
+                return bool(LINE[(king_sq << 6) | from_sq] >> to_sq & 1)
+            return True
+        
+        # En passant (or a move of the side not to move): try it in place
+        # and take it back
+        piece = self.board[from_sq]
+        if not piece:
+            return False
+        board = self.board
+        touched = [(from_row, from_col, piece), (to_row, to_col, board[to_row * 8 + to_col])]
+        if kind == PAWN and self.en_passant_target == (to_row, to_col):
+            captured_pawn_row = to_row + (1 if side == WHITE else -1)
+            touched.append((captured_pawn_row, to_col, board[captured_pawn_row * 8 + to_col]))
+        king_pos = self.kings[piece.color]
+        self._make_move_unchecked(from_row, from_col, to_row, to_col)
+        legal = not self._is_king_attacked(self.current_player)
+        # Put back the original (shared, never mutated) pieces, which also
+        # restores the hash, material and bitboards
+        for row, col, original in touched:
+            self._remove_piece(row, col)
+            if original:
+                self._place_piece(row, col, original)
+        self.kings[piece.color] = king_pos
+        return legal
+    
+    def _checkers_and_pins(self) -> Tuple[int, int, int]:
+        """(king square, checkers, pinned pieces) for the side to move
+        
+        A piece is pinned when it is the only piece between its king and an
+        enemy slider on the same line.
+        """
+        side = self.side_to_move
+        king_row, king_col = self.kings[self.current_player]
+        king_sq = king_row * 8 + king_col
+        checkers = self.attackers_to(king_sq, side ^ 1)
+        enemy = self.bitboards[side ^ 1]
+        own = self.occupied[side]
+        occupied = own | self.occupied[side ^ 1]
+        # Enemy sliders that would attack the king on an empty board
+        snipers = ((rook_attacks(king_sq, 0) & (enemy[ROOK] | enemy[QUEEN])) |
+                   (bishop_attacks(king_sq, 0) & (enemy[BISHOP] | enemy[QUEEN])))
+        pinned = 0
+        while snipers:
+            sniper = (snipers & -snipers).bit_length() - 1
+            snipers &= snipers - 1
+            blockers = BETWEEN[(king_sq << 6) | sniper] & occupied
+            if blockers & own and not blockers & (blockers - 1):
+                pinned |= blockers
+        return king_sq, checkers, pinned
     
     def _make_move_unchecked(self, from_row: int, from_col: int, to_row: int, to_col: int) -> bool:
         """Make a move without checking for legality"""
-        piece = self.board[from_row][from_col]
+        piece = self.board[from_row * 8 + from_col]
         if not piece:
             return False
         
         # Handle special moves
-        if piece.type == PieceType.KING and abs(to_col - from_col) == 2:
+        if piece.kind == KING and abs(to_col - from_col) == 2:
             # Castling
             rook_col = 7 if to_col > from_col else 0
             rook_new_col = 5 if to_col > from_col else 3
-            rook = self.board[from_row][rook_col]
-            self.board[from_row][rook_new_col] = rook
-            self.board[from_row][rook_col] = None
+            rook = self._remove_piece(from_row, rook_col)
             if rook:
-                rook.has_moved = True
+                if not rook.has_moved:
+                    rook = MOVED_PIECES[rook.side][ROOK]
+                self._place_piece(from_row, rook_new_col, rook)
         
-        elif piece.type == PieceType.PAWN and self.en_passant_target == (to_row, to_col):
+        elif piece.kind == PAWN and self.en_passant_target == (to_row, to_col):
             # En passant capture
-            captured_pawn_row = to_row + (1 if piece.color == Color.WHITE else -1)
-            self.board[captured_pawn_row][to_col] = None
+            captured_pawn_row = to_row + (1 if piece.side == WHITE else -1)
+            self._remove_piece(captured_pawn_row, to_col)
         
-        # Make the move
-        self.board[to_row][to_col] = piece
-        self.board[from_row][from_col] = None
-        piece.has_moved = True
+        # Make the move.  Pieces can be shared between board copies, so a
+        # piece moving for the first time is replaced rather than mutated.
+        self._remove_piece(to_row, to_col)
+        self._remove_piece(from_row, from_col)
+        if not piece.has_moved:
+            piece = MOVED_PIECES[piece.side][piece.kind]
+        self._place_piece(to_row, to_col, piece)
         
         # Update king position
-        if piece.type == PieceType.KING:
+        if piece.kind == KING:
             self.kings[piece.color] = (to_row, to_col)
         
         return True
     
+    def try_make_move(self, from_row: int, from_col: int, to_row: int, to_col: int,
+                      special_move_type=None, promotion_piece=None) -> bool:
+        """make_move for untrusted input: returns False rather than raising
+        
+        Rejects coordinates that aren't on the board (which would otherwise
+        index the wrong square or fail), a from square that doesn't hold a
+        piece of the side to move, and a non-string promotion piece.
+        """
+        for value in (from_row, from_col, to_row, to_col):
+            if not isinstance(value, int) or not 0 <= value < 8:
+                return False
+        piece = self.board[from_row * 8 + from_col]
+        if piece is None or piece.color != self.current_player:
+            return False
+        if promotion_piece is not None and not isinstance(promotion_piece, str):
+            return False
+        return self.make_move(from_row, from_col, to_row, to_col,
+                              special_move_type, promotion_piece)
+    
     def make_move(self, from_row: int, from_col: int, to_row: int, to_col: int, 
                   special_move_type=None, promotion_piece=None) -> bool:
         """Make a move with full validation and game state updates"""
-        if not self._is_legal_move(from_row, from_col, to_row, to_col):
+        if not (self.is_pseudo_legal(from_row, from_col, to_row, to_col) and
+                self._is_legal_move(from_row, from_col, to_row, to_col)):
             return False
+        return self.make_legal_move(from_row, from_col, to_row, to_col,
+                                    special_move_type, promotion_piece)
+    
+    def make_legal_move(self, from_row: int, from_col: int, to_row: int, to_col: int,
+                        special_move_type=None, promotion_piece=None) -> bool:
+        """make_move without the legality check, for moves from get_all_legal_moves
         
-        piece = self.board[from_row][from_col]
-        captured_piece = self.board[to_row][to_col]
-        
-        # Update en passant target
-        old_en_passant = self.en_passant_target
-        self.en_passant_target = None
-        
-        if piece.type == PieceType.PAWN and abs(to_row - from_row) == 2:
-            self.en_passant_target = ((from_row + to_row) // 2, from_col)
+        Search rollouts play thousands of moves they have just generated;
+        re-testing each one for legality would repeat the generator's work.
+        """
+        piece = self.board[from_row * 8 + from_col]
+        captured_piece = self.board[to_row * 8 + to_col]
+        # Previous contents of every square the move touches, for unmake_move
+        touched = [(from_row, from_col, piece), (to_row, to_col, captured_piece)]
+        if piece.kind == KING and abs(to_col - from_col) == 2:
+            rook_col = 7 if to_col > from_col else 0
+            rook_new_col = 5 if to_col > from_col else 3
+            touched.append((from_row, rook_col, self.board[from_row * 8 + rook_col]))
+            touched.append((from_row, rook_new_col, None))
+        elif piece.kind == PAWN and self.en_passant_target == (to_row, to_col):
+            captured_pawn_row = to_row + (1 if piece.side == WHITE else -1)
+            touched.append((captured_pawn_row, to_col, self.board[captured_pawn_row * 8 + to_col]))
+        undo = (touched, self.castling, self.en_passant_target, self.halfmove_clock,
+                self.fullmove_number, self.zobrist, self._position_history,
+                self._position_counts)
+        # Take the old side/castling/en passant keys out; added back below
+        self.zobrist ^= self._state_hash()
         
-        # Make the move
+        # Make the move (en passant captures need the target from the previous ply)
         success = self._make_move_unchecked(from_row, from_col, to_row, to_col)
         if not success:
             return False
         
+        # Update en passant target
+        self.en_passant_target = None
+        if piece.kind == PAWN and abs(to_row - from_row) == 2:
+            self.en_passant_target = ((from_row + to_row) // 2, from_col)
+        
         # Handle pawn promotion
-        if piece.type == PieceType.PAWN and (to_row == 0 or to_row == 7):
-            promotion_type = PieceType.QUEEN  # Default to queen
+        if piece.kind == PAWN and (to_row == 0 or to_row == 7):
+            promotion_kind = QUEEN  # Default to queen
             if promotion_piece:
-                promotion_map = {
-                    'Q': PieceType.QUEEN, 'R': PieceType.ROOK,
-                    'B': PieceType.BISHOP, 'N': PieceType.KNIGHT
-                }
-                promotion_type = promotion_map.get(promotion_piece.upper(), PieceType.QUEEN)
-            self.board[to_row][to_col] = Piece(promotion_type, piece.color, True)
+                promotion_kind = PROMOTION_KINDS.get(promotion_piece.upper(), QUEEN)
+            self._remove_piece(to_row, to_col)
+            self._place_piece(to_row, to_col, MOVED_PIECES[piece.side][promotion_kind])
         
         # Update castling rights
-        if piece.type == PieceType.KING:
-            self.castling_rights[piece.color]["kingside"] = False
-            self.castling_rights[piece.color]["queenside"] = False
-        elif piece.type == PieceType.ROOK:
-            if from_row == 0 or from_row == 7:
-                if from_col == 0:
-                    self.castling_rights[piece.color]["queenside"] = False
-                elif from_col == 7:
-                    self.castling_rights[piece.color]["kingside"] = False
+        self.castling &= CASTLING_UPDATE[from_row * 8 + from_col] & CASTLING_UPDATE[to_row * 8 + to_col]
         
         # Update move counters
-        if piece.type == PieceType.PAWN or captured_piece:
+        if piece.kind == PAWN or captured_piece:
             self.halfmove_clock = 0
         else:
             self.halfmove_clock += 1
         
-        if self.current_player == Color.BLACK:
+        if self.side_to_move == BLACK:
             self.fullmove_number += 1
         
         # Record move
         move_notation = f"{chr(97 + from_col)}{8 - from_row}{chr(97 + to_col)}{8 - to_row}"
         self.move_history.append(move_notation)
-        self.position_history.append(self._get_position_key())
         
         # Switch players
-        self.current_player = Color.BLACK if self.current_player == Color.WHITE else Color.WHITE
+        self.side_to_move ^= 1
+        self.current_player = Color.BLACK if self.side_to_move else Color.WHITE
+        self.zobrist ^= self._state_hash()
+        
+        # Earlier positions can never recur after a capture or pawn move
+        if self.halfmove_clock == 0:
+            self._position_history = []
+            self._position_counts = Counter()
+        self._position_history.append(self.zobrist)
+        self._position_counts[self.zobrist] += 1
+        self._undo_stack.append(undo)
+        self._dict_cache = None
+        
+        return True
+    
+    def unmake_move(self) -> bool:
+        """Take back the last move made with make_move, restoring the exact prior state"""
+        if not self._undo_stack:
+            return False
+        (touched, castling, en_passant_target, halfmove_clock, fullmove_number,
+         zobrist, position_history, position_counts) = self._undo_stack.pop()
+        
+        # Drop this position from the repetition history.  If the move reset
+        # it, the old history objects come back untouched instead.
+        if position_history is self._position_history:
+            key = self._position_history.pop()
+            self._position_counts[key] -= 1
+            if not self._position_counts[key]:
+                del self._position_counts[key]
+        else:
+            self._position_history = position_history
+            self._position_counts = position_counts
+        
+        # Put back the original (shared, never mutated) pieces
+        for row, col, piece in touched:
+            self._remove_piece(row, col)
+            if piece:
+                self._place_piece(row, col, piece)
+        moved = touched[0][2]
+        if moved.kind == KING:
+            self.kings[moved.color] = (touched[0][0], touched[0][1])
+        
+        self.current_player = moved.color
+        self.side_to_move = moved.side
+        self.castling = castling
+        self.en_passant_target = en_passant_target
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
+        self.zobrist = zobrist
+        self.move_history.pop()
+        self._dict_cache = None
         
         return True
     
     def is_in_check(self, color: Color) -> bool:
         """Check if the king of the given color is in check"""
-        king_pos = self.kings[color]
-        opponent_color = Color.BLACK if color == Color.WHITE else Color.WHITE
+        if color == self.current_player:
+            return self._position_status()[0]
+        return self._is_king_attacked(color)
+    
+    def _is_king_attacked(self, color: Color) -> bool:
+        """Uncached check test, also valid on half-made trial boards"""
+        row, col = self.kings[color]
+        return self.is_square_attacked(row * 8 + col, BLACK if color == Color.WHITE else WHITE)
+    
+    def _position_status(self) -> list:
+        """Memoized [in check, has no legal move, legal moves] for the side to move"""
+        status = self._status_cache.get(self.zobrist)
+        if status is None:
+            if len(self._status_cache) >= STATUS_CACHE_SIZE:
+                self._status_cache.clear()
+            status = [self._is_king_attacked(self.current_player), None, None]
+            self._status_cache[self.zobrist] = status
+        return status
+    
+    def _has_no_legal_moves(self) -> bool:
+        """Whether the side to move has no legal move, memoized per position"""
+        status = self._position_status()
+        if status[1] is None:
+            # Stop at the first legal move; a full list is not needed here
+            status[1] = next(self._iter_legal_moves(), None) is None
+        return status[1]
+    
+    def is_square_attacked(self, sq: int, side: int, occupied: Optional[int] = None) -> bool:
+        """Whether any piece of side (WHITE/BLACK) attacks square sq
         
-        # Check if any opponent piece can attack the king using raw moves
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and piece.color == opponent_color:
-                    # Use raw moves to avoid recursion
-                    moves = self._get_raw_piece_moves(row, col)
-                    if king_pos in moves:
-                        return True
-        return False
+        Like attackers_to, but stops at the first attacker found.  Sliders
+        are traced through occupied, by default the current occupancy.
+        """
+        pieces = self.bitboards[side]
+        if (KNIGHT_ATTACKS[sq] & pieces[KNIGHT] or PAWN_ATTACKS[side ^ 1][sq] & pieces[PAWN] or
+                KING_ATTACKS[sq] & pieces[KING]):
+            return True
+        if occupied is None:
+            occupied = self.occupied[WHITE] | self.occupied[BLACK]
+        rooks = pieces[ROOK] | pieces[QUEEN]
+        if rooks and rook_attacks(sq, occupied) & rooks:
+            return True
+        bishops = pieces[BISHOP] | pieces[QUEEN]
+        return bool(bishops and bishop_attacks(sq, occupied) & bishops)
     
-    def _is_square_attacked(self, row: int, col: int, defending_color: Color) -> bool:
-        """Check if a square is attacked by the opponent"""
-        attacking_color = Color.BLACK if defending_color == Color.WHITE else Color.WHITE
-        
-        for r in range(8):
-            for c in range(8):
-                piece = self.board[r][c]
-                if piece and piece.color == attacking_color:
-                    # Use raw moves to avoid recursion
-                    raw_moves = self._get_raw_piece_moves(r, c)
-                    if (row, col) in raw_moves:
-                        return True
-        return False
+    def attackers_to(self, sq: int, side: int) -> int:
+        """Bitboard of the pieces of side (WHITE/BLACK) that attack square sq"""
+        pieces = self.bitboards[side]
+        occupied = self.occupied[WHITE] | self.occupied[BLACK]
+        # A pawn of side attacks sq exactly when a pawn of the other side on
+        # sq would attack the pawn's square
+        attackers = ((KNIGHT_ATTACKS[sq] & pieces[KNIGHT]) |
+                     (KING_ATTACKS[sq] & pieces[KING]) |
+                     (PAWN_ATTACKS[side ^ 1][sq] & pieces[PAWN]))
+        rooks = pieces[ROOK] | pieces[QUEEN]
+        if rooks:
+            attackers |= rook_attacks(sq, occupied) & rooks
+        bishops = pieces[BISHOP] | pieces[QUEEN]
+        if bishops:
+            attackers |= bishop_attacks(sq, occupied) & bishops
+        return attackers
+    
+    def gives_check(self, from_row: int, from_col: int, to_row: int, to_col: int) -> bool:
+        """Check whether a legal move of the current player checks the opponent's king
+        
+        Works from the attack tables on the occupancy after the move instead
+        of making it: the moved piece attacking the king from its new square,
+        or a slider of the mover seeing the king through the vacated square
+        (discovered check).  Promotions count as queens, as in make_move.
+        """
+        us = self.side_to_move
+        king_row, king_col = self.kings[Color.BLACK if us == WHITE else Color.WHITE]
+        king_sq = king_row * 8 + king_col
+        from_bit = 1 << (from_row * 8 + from_col)
+        to_bit = 1 << (to_row * 8 + to_col)
+        kind = abs(self.squares[from_row * 8 + from_col])
+        pieces = self.bitboards[us]
+        occupied = (self.occupied[WHITE] | self.occupied[BLACK]) & ~from_bit | to_bit
+        rooks = (pieces[ROOK] | pieces[QUEEN]) & ~from_bit
+        bishops = (pieces[BISHOP] | pieces[QUEEN]) & ~from_bit
+        
+        if kind == PAWN:
+            if to_row == 0 or to_row == 7:
+                kind = QUEEN
+            elif PAWN_ATTACKS[us][to_row * 8 + to_col] & (1 << king_sq):
+                return True
+            elif self.en_passant_target == (to_row, to_col):
+                # The captured pawn leaves its square beside the from square
+                occupied &= ~(1 << (from_row * 8 + to_col))
+        elif kind == KNIGHT:
+            if KNIGHT_ATTACKS[to_row * 8 + to_col] & (1 << king_sq):
+                return True
+        elif kind == KING and abs(to_col - from_col) == 2:
+            # Castling also moves the rook
+            rook_bits = ((1 << (from_row * 8 + (7 if to_col > from_col else 0))) |
+                         (1 << (from_row * 8 + (5 if to_col > from_col else 3))))
+            occupied ^= rook_bits
+            rooks ^= rook_bits
+        
+        if kind == ROOK or kind == QUEEN:
+            rooks |= to_bit
+        if kind == BISHOP or kind == QUEEN:
+            bishops |= to_bit
+        return bool(rook_attacks(king_sq, occupied) & rooks or
+                    bishop_attacks(king_sq, occupied) & bishops)
     
     def is_checkmate(self) -> bool:
         """Check if current player is in checkmate"""
         if not self.is_in_check(self.current_player):
             return False
-        return len(self.get_all_legal_moves()) == 0
+        return self._has_no_legal_moves()
     
     def is_stalemate(self) -> bool:
         """Check if current player is in stalemate"""
         if self.is_in_check(self.current_player):
             return False
-        return len(self.get_all_legal_moves()) == 0
+        return self._has_no_legal_moves()
     
     def is_draw_by_fifty_moves(self) -> bool:
         """Check for draw by 50-move rule"""
@@ -434,63 +1205,43 @@ class ChessBoard:
     
     def is_insufficient_material(self) -> bool:
         """Check for insufficient material to checkmate"""
-        white_pieces = []
-        black_pieces = []
+        white = self.bitboards[WHITE]
+        black = self.bitboards[BLACK]
         
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and piece.type != PieceType.KING:
-                    if piece.color == Color.WHITE:
-                        white_pieces.append((piece.type, row, col))
-                    else:
-                        black_pieces.append((piece.type, row, col))
-        
-        # King vs King
-        if len(white_pieces) == 0 and len(black_pieces) == 0:
-            return True
+        # Any pawn, rook or queen is enough material to mate
+        if (white[PAWN] | black[PAWN] | white[ROOK] | black[ROOK] |
+                white[QUEEN] | black[QUEEN]):
+            return False
+        
+        white_knights = white[KNIGHT].bit_count()
+        black_knights = black[KNIGHT].bit_count()
+        bishops = white[BISHOP] | black[BISHOP]
+        minor_pieces = white_knights + black_knights + bishops.bit_count()
         
-        # King and minor piece vs King
-        if ((len(white_pieces) == 1 and len(black_pieces) == 0 and 
-             white_pieces[0][0] in [PieceType.BISHOP, PieceType.KNIGHT]) or
-            (len(black_pieces) == 1 and len(white_pieces) == 0 and 
-             black_pieces[0][0] in [PieceType.BISHOP, PieceType.KNIGHT])):
+        # King vs King, or King and minor piece vs King
+        if minor_pieces <= 1:
             return True
         
+        # Kings and bishops only, with every bishop on the same square color
+        if white_knights == 0 and black_knights == 0:
+            return (bishops & DARK_SQUARES) == 0 or (bishops & ~DARK_SQUARES) == 0
+        
         return False
     
     def is_threefold_repetition(self) -> bool:
         """Check for threefold repetition"""
-        if len(self.position_history) < 8:
-            return False
-        
-        current_position = self._get_position_key()
-        count = self.position_history.count(current_position)
-        return count >= 2  # Current position + 2 previous = 3 total
-    
-    def _get_position_key(self) -> str:
-        """Get a position key for repetition detection"""
-        position_str = ""
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece:
-                    position_str += f"{piece.color.value[0]}{piece.type.value}"
-                else:
-                    position_str += "."
-        
-        position_str += f"{self.current_player.value}"
-        position_str += str(self.castling_rights)
-        position_str += str(self.en_passant_target)
-        
-        return position_str
+        return self._position_counts[self.zobrist] >= 3
     
     def get_game_result(self) -> GameResult:
         """Determine the current game result"""
-        if self.is_checkmate():
+        return self._game_result(self.is_in_check(self.current_player), self._has_no_legal_moves())
+    
+    def _game_result(self, in_check: bool, no_legal_moves: bool) -> GameResult:
+        """Game result given the side to move's check and legal-move status"""
+        if no_legal_moves and in_check:
             return GameResult.BLACK_WINS if self.current_player == Color.WHITE else GameResult.WHITE_WINS
         
-        if (self.is_stalemate() or self.is_draw_by_fifty_moves() or 
+        if (no_legal_moves or self.is_draw_by_fifty_moves() or 
             self.is_insufficient_material() or self.is_threefold_repetition()):
             return GameResult.DRAW
         
@@ -498,27 +1249,14 @@ class ChessBoard:
     
     def calculate_material_balance(self) -> Dict:
         """Calculate material balance for both sides"""
-        piece_values = {
-            PieceType.PAWN: 1, PieceType.KNIGHT: 3, PieceType.BISHOP: 3,
-            PieceType.ROOK: 5, PieceType.QUEEN: 9, PieceType.KING: 0
-        }
-        
-        white_material = 0
-        black_material = 0
+        white_material, black_material = self.material
         white_pieces = []
         black_pieces = []
         
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece:
-                    value = piece_values[piece.type]
-                    if piece.color == Color.WHITE:
-                        white_material += value
-                        white_pieces.append(piece.type.value)
-                    else:
-                        black_material += value
-                        black_pieces.append(piece.type.value)
+        # Popcount each piece bitboard instead of scanning all 64 squares
+        for piece_type, kind in PIECE_INDEX.items():
+            white_pieces.extend([piece_type.value] * self.bitboards[WHITE][kind].bit_count())
+            black_pieces.extend([piece_type.value] * self.bitboards[BLACK][kind].bit_count())
         
         return {
             'white_material': white_material,
@@ -528,41 +1266,58 @@ class ChessBoard:
             'black_pieces': black_pieces
         }
     
-    def to_dict(self) -> Dict:
-        """Convert board to dictionary for JSON serialization"""
-        board_dict = []
-        for row in range(8):
-            row_dict = []
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece:
-                    row_dict.append({
-                        'type': piece.type.value,
-                        'color': piece.color.value,
-                        'has_moved': piece.has_moved
-                    })
-                else:
-                    row_dict.append(None)
-            board_dict.append(row_dict)
-        
-        material_info = self.calculate_material_balance()
-        game_result = self.get_game_result()
+    def to_dict(self, include_legal_moves: bool = False) -> Dict:
+        """Convert board to dictionary for JSON serialization
         
-        return {
-            'board': board_dict,
-            'current_player': self.current_player.value,
-            'move_history': self.move_history,
-            'kings': {color.value: pos for color, pos in self.kings.items()},
-            'material_balance': material_info,
-            'game_result': game_result.value,
-            'is_check': self.is_in_check(self.current_player),
-            'is_checkmate': self.is_checkmate(),
-            'is_stalemate': self.is_stalemate(),
-            'is_draw': game_result == GameResult.DRAW,
-            'castling_rights': {
-                color.value: rights for color, rights in self.castling_rights.items()
-            },
-            'en_passant_target': self.en_passant_target,
-            'halfmove_clock': self.halfmove_clock,
-            'fullmove_number': self.fullmove_number
-        }
+        Legal moves are generated once per position and the result is reused
+        until the next move, so repeated calls between moves are cheap.  With
+        include_legal_moves the dict also carries them under 'legal_moves'.
+        """
+        if self._dict_cache is None:
+            legal_moves = self.get_all_legal_moves()
+            in_check = self.is_in_check(self.current_player)
+            no_legal_moves = not legal_moves
+            game_result = self._game_result(in_check, no_legal_moves)
+            
+            cache = self._piece_cache
+            board_dict = [cache[start:start + 8] for start in range(0, 64, 8)]
+            
+            state = {
+                'board': board_dict,
+                'current_player': self.current_player.value,
+                # A copy, so snapshots already handed out (e.g. to a queued
+                # broadcast) do not change when the next move is made
+                'move_history': list(self.move_history),
+                'kings': {color.value: pos for color, pos in self.kings.items()},
+                'material_balance': self.calculate_material_balance(),
+                'game_result': game_result.value,
+                'is_check': in_check,
+                'is_checkmate': in_check and no_legal_moves,
+                'is_stalemate': no_legal_moves and not in_check,
+                'is_draw': game_result == GameResult.DRAW,
+                'castling_rights': {
+                    color.value: rights for color, rights in self.castling_rights.items()
+                },
+                'en_passant_target': self.en_passant_target,
+                'halfmove_clock': self.halfmove_clock,
+                'fullmove_number': self.fullmove_number
+            }
+            self._dict_cache = (state, legal_moves)
+        
+        state, legal_moves = self._dict_cache
+        board_state = dict(state)
+        if include_legal_moves:
+            board_state['legal_moves'] = list(legal_moves)
+        return board_state
+
+
+# Pseudo-legal target generators indexed by integer piece code (slot 0 is EMPTY)
+_MOVE_TARGETS = (
+    None,
+    ChessBoard._pawn_targets,
+    ChessBoard._knight_targets,
+    ChessBoard._bishop_targets,
+    ChessBoard._rook_targets,
+    ChessBoard._queen_targets,
+    ChessBoard._king_targets,
+)
@@ -1,114 +1,202 @@
 """
 Chess position evaluation for strategic play.
 """
-from typing import Dict
-from .chess_board import ChessBoard, Color, PieceType
+from operator import itemgetter
+from typing import Dict, List, Tuple
+from .chess_board import (
+    ChessBoard, Color, COLOR_INDEX, MATERIAL_VALUES, PIECE_INDEX,
+    WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+)
+
+
+# Piece-Square Tables, laid out from White's side (row 0 is the eighth rank)
+PAWN_TABLE = [
+    [ 0,  0,  0,  0,  0,  0,  0,  0],
+    [50, 50, 50, 50, 50, 50, 50, 50],
+    [10, 10, 20, 30, 30, 20, 10, 10],
+    [ 5,  5, 10, 25, 25, 10,  5,  5],
+    [ 0,  0,  0, 20, 20,  0,  0,  0],
+    [ 5, -5,-10,  0,  0,-10, -5,  5],
+    [ 5, 10, 10,-20,-20, 10, 10,  5],
+    [ 0,  0,  0,  0,  0,  0,  0,  0]
+]
+
+KNIGHT_TABLE = [
+    [-50,-40,-30,-30,-30,-30,-40,-50],
+    [-40,-20,  0,  0,  0,  0,-20,-40],
+    [-30,  0, 10, 15, 15, 10,  0,-30],
+    [-30,  5, 15, 20, 20, 15,  5,-30],
+    [-30,  0, 15, 20, 20, 15,  0,-30],
+    [-30,  5, 10, 15, 15, 10,  5,-30],
+    [-40,-20,  0,  5,  5,  0,-20,-40],
+    [-50,-40,-30,-30,-30,-30,-40,-50]
+]
+
+BISHOP_TABLE = [
+    [-20,-10,-10,-10,-10,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5, 10, 10,  5,  0,-10],
+    [-10,  5,  5, 10, 10,  5,  5,-10],
+    [-10,  0, 10, 10, 10, 10,  0,-10],
+    [-10, 10, 10, 10, 10, 10, 10,-10],
+    [-10,  5,  0,  0,  0,  0,  5,-10],
+    [-20,-10,-10,-10,-10,-10,-10,-20]
+]
+
+ROOK_TABLE = [
+    [ 0,  0,  0,  0,  0,  0,  0,  0],
+    [ 5, 10, 10, 10, 10, 10, 10,  5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [ 0,  0,  0,  5,  5,  0,  0,  0]
+]
+
+QUEEN_TABLE = [
+    [-20,-10,-10, -5, -5,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5,  5,  5,  5,  0,-10],
+    [ -5,  0,  5,  5,  5,  5,  0, -5],
+    [  0,  0,  5,  5,  5,  5,  0, -5],
+    [-10,  5,  5,  5,  5,  5,  0,-10],
+    [-10,  0,  5,  0,  0,  0,  0,-10],
+    [-20,-10,-10, -5, -5,-10,-10,-20]
+]
+
+KING_MIDDLEGAME_TABLE = [
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-20,-30,-30,-40,-40,-30,-30,-20],
+    [-10,-20,-20,-20,-20,-20,-20,-10],
+    [ 20, 20,  0,  0,  0,  0, 20, 20],
+    [ 20, 30, 10,  0,  0, 10, 30, 20]
+]
+
+KING_ENDGAME_TABLE = [
+    [-50,-40,-30,-20,-20,-30,-40,-50],
+    [-30,-20,-10,  0,  0,-10,-20,-30],
+    [-30,-10, 20, 30, 30, 20,-10,-30],
+    [-30,-10, 30, 40, 40, 30,-10,-30],
+    [-30,-10, 30, 40, 40, 30,-10,-30],
+    [-30,-10, 20, 30, 30, 20,-10,-30],
+    [-30,-30,  0,  0,  0,  0,-30,-30],
+    [-50,-30,-30,-30,-30,-30,-30,-50]
+]
+
+
+def _square_tables(king_table):
+    """Flat 64-entry tables for both sides, indexed [side][piece code][square]
+
+    Black's copies are mirrored vertically up front (sq ^ 56) so lookups
+    need no per-piece flipping.
+    """
+    tables = (PAWN_TABLE, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, king_table)
+    white = tuple(tuple(sum(table, [])) for table in tables)
+    black = tuple(tuple(table[sq ^ 56] for sq in range(64)) for table in white)
+    # Slot 0 is EMPTY so the tuples index directly by piece code
+    return (None,) + white, (None,) + black
+
+
+# SQUARE_TABLES[is_endgame][side][piece code][square]
+SQUARE_TABLES = (_square_tables(KING_MIDDLEGAME_TABLE), _square_tables(KING_ENDGAME_TABLE))
+
+# Centipawn value of each piece code (slot 0 is EMPTY)
+PIECE_VALUE = (0, 100, 320, 330, 500, 900, 20000)
+
+# Capture value of each piece code for move ordering (a king is never taken)
+CAPTURE_VALUES = MATERIAL_VALUES
+
+# The four central squares (d4, e4, d5, e5) and the ring of twelve around them
+CENTER_MASK = (1 << 27) | (1 << 28) | (1 << 35) | (1 << 36)
+EXTENDED_CENTER_MASK = sum(1 << (row * 8 + col) for row in range(2, 6)
+                           for col in range(2, 6)) & ~CENTER_MASK
+
+# Squares of each file, and of the files either side of it (0 past the edge)
+FILE_MASK = tuple(0x0101010101010101 << col for col in range(8))
+ADJACENT_FILES_MASK = tuple((FILE_MASK[col - 1] if col > 0 else 0) |
+                            (FILE_MASK[col + 1] if col < 7 else 0)
+                            for col in range(8))
+
+# Squares ahead of a pawn on sq, on its own and the adjacent files: the pawn
+# is passed when no enemy pawn stands on them.  White pawns advance towards
+# row 0, black pawns towards row 7.
+WHITE_PASSED_MASK = tuple(sum(1 << (r * 8 + c) for r in range(sq >> 3)
+                              for c in range(max((sq & 7) - 1, 0), min((sq & 7) + 2, 8)))
+                          for sq in range(64))
+BLACK_PASSED_MASK = tuple(sum(1 << (r * 8 + c) for r in range((sq >> 3) + 1, 8)
+                              for c in range(max((sq & 7) - 1, 0), min((sq & 7) + 2, 8)))
+                          for sq in range(64))
+
+# The up to three squares directly in front of a king on sq, towards the
+# opponent, indexed [side][sq]; 0 on the last rank
+KING_SHIELD_MASK = tuple(
+    tuple(sum(1 << (((sq >> 3) + direction) * 8 + c)
+              for c in range(max((sq & 7) - 1, 0), min((sq & 7) + 2, 8)))
+          if 0 <= (sq >> 3) + direction < 8 else 0
+          for sq in range(64))
+    for direction in (-1, 1))
+
+
+def _pawn_scores(white_pawns: int, black_pawns: int) -> Tuple[int, int]:
+    """(structure, promotion) pawn terms computed from the pawn bitboards
+    
+    Structure covers doubled and isolated pawns; promotion covers
+    advancement and passed pawns.
+    """
+    structure = 0
+    for col in range(8):
+        white = (white_pawns & FILE_MASK[col]).bit_count()
+        black = (black_pawns & FILE_MASK[col]).bit_count()
+        
+        # Doubled pawns penalty
+        if white > 1:
+            structure -= 20 * (white - 1)
+        if black > 1:
+            structure += 20 * (black - 1)
+        
+        # Isolated pawns penalty
+        if white and not white_pawns & ADJACENT_FILES_MASK[col]:
+            structure -= 15
+        if black and not black_pawns & ADJACENT_FILES_MASK[col]:
+            structure += 15
+    
+    promotion = 0
+    bb = white_pawns
+    while bb:
+        sq = (bb & -bb).bit_length() - 1
+        bb &= bb - 1
+        row = sq >> 3
+        promotion += (7 - row) * 15
+        if not black_pawns & WHITE_PASSED_MASK[sq]:
+            promotion += 50 + (7 - row) * 20
+    bb = black_pawns
+    while bb:
+        sq = (bb & -bb).bit_length() - 1
+        bb &= bb - 1
+        row = sq >> 3
+        promotion -= row * 15
+        if not white_pawns & BLACK_PASSED_MASK[sq]:
+            promotion -= 50 + row * 20
+    
+    return structure, promotion
 
 
 class ChessEvaluator:
     """Advanced chess position evaluator with strategic and tactical awareness"""
     
     def __init__(self):
-        # Piece values
-        self.piece_values = {
-            PieceType.PAWN: 100,
-            PieceType.KNIGHT: 320,
-            PieceType.BISHOP: 330,
-            PieceType.ROOK: 500,
-            PieceType.QUEEN: 900,
-            PieceType.KING: 20000
-        }
-        
-        # Piece-Square Tables
-        self.pawn_table = [
-            [ 0,  0,  0,  0,  0,  0,  0,  0],
-            [50, 50, 50, 50, 50, 50, 50, 50],
-            [10, 10, 20, 30, 30, 20, 10, 10],
-            [ 5,  5, 10, 25, 25, 10,  5,  5],
-            [ 0,  0,  0, 20, 20,  0,  0,  0],
-            [ 5, -5,-10,  0,  0,-10, -5,  5],
-            [ 5, 10, 10,-20,-20, 10, 10,  5],
-            [ 0,  0,  0,  0,  0,  0,  0,  0]
-        ]
-        
-        self.knight_table = [
-            [-50,-40,-30,-30,-30,-30,-40,-50],
-            [-40,-20,  0,  0,  0,  0,-20,-40],
-            [-30,  0, 10, 15, 15, 10,  0,-30],
-            [-30,  5, 15, 20, 20, 15,  5,-30],
-            [-30,  0, 15, 20, 20, 15,  0,-30],
-            [-30,  5, 10, 15, 15, 10,  5,-30],
-            [-40,-20,  0,  5,  5,  0,-20,-40],
-            [-50,-40,-30,-30,-30,-30,-40,-50]
-        ]
-        
-        self.bishop_table = [
-            [-20,-10,-10,-10,-10,-10,-10,-20],
-            [-10,  0,  0,  0,  0,  0,  0,-10],
-            [-10,  0,  5, 10, 10,  5,  0,-10],
-            [-10,  5,  5, 10, 10,  5,  5,-10],
-            [-10,  0, 10, 10, 10, 10,  0,-10],
-            [-10, 10, 10, 10, 10, 10, 10,-10],
-            [-10,  5,  0,  0,  0,  0,  5,-10],
-            [-20,-10,-10,-10,-10,-10,-10,-20]
-        ]
-        
-        self.rook_table = [
-            [ 0,  0,  0,  0,  0,  0,  0,  0],
-            [ 5, 10, 10, 10, 10, 10, 10,  5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [ 0,  0,  0,  5,  5,  0,  0,  0]
-        ]
-        
-        self.queen_table = [
-            [-20,-10,-10, -5, -5,-10,-10,-20],
-            [-10,  0,  0,  0,  0,  0,  0,-10],
-            [-10,  0,  5,  5,  5,  5,  0,-10],
-            [ -5,  0,  5,  5,  5,  5,  0, -5],
-            [  0,  0,  5,  5,  5,  5,  0, -5],
-            [-10,  5,  5,  5,  5,  5,  0,-10],
-            [-10,  0,  5,  0,  0,  0,  0,-10],
-            [-20,-10,-10, -5, -5,-10,-10,-20]
-        ]
-        
-        self.king_middlegame_table = [
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-20,-30,-30,-40,-40,-30,-30,-20],
-            [-10,-20,-20,-20,-20,-20,-20,-10],
-            [ 20, 20,  0,  0,  0,  0, 20, 20],
-            [ 20, 30, 10,  0,  0, 10, 30, 20]
-        ]
-        
-        self.king_endgame_table = [
-            [-50,-40,-30,-20,-20,-30,-40,-50],
-            [-30,-20,-10,  0,  0,-10,-20,-30],
-            [-30,-10, 20, 30, 30, 20,-10,-30],
-            [-30,-10, 30, 40, 40, 30,-10,-30],
-            [-30,-10, 30, 40, 40, 30,-10,-30],
-            [-30,-10, 20, 30, 30, 20,-10,-30],
-            [-30,-30,  0,  0,  0,  0,-30,-30],
-            [-50,-30,-30,-30,-30,-30,-30,-50]
-        ]
-        
-        self.piece_tables = {
-            PieceType.PAWN: self.pawn_table,
-            PieceType.KNIGHT: self.knight_table,
-            PieceType.BISHOP: self.bishop_table,
-            PieceType.ROOK: self.rook_table,
-            PieceType.QUEEN: self.queen_table
-        }
+        # Piece values (the hot paths index PIECE_VALUE by piece code)
+        self.piece_values = {piece_type: PIECE_VALUE[kind]
+                             for piece_type, kind in PIECE_INDEX.items()}
     
     def evaluate_position(self, board: ChessBoard) -> int:
         """Evaluate chess position with strategic and tactical considerations"""
         score = 0
-        total_pieces = self._count_total_pieces(board)
+        total_pieces = board.piece_count
         is_endgame = total_pieces <= 16
         
         # 1. Material and positional evaluation
@@ -126,97 +214,65 @@ class ChessEvaluator:
         # 5. King safety
         score += self._evaluate_king_safety(board)
         
-        # 6. Pawn structure
-        score += self._evaluate_pawn_structure(board)
+        # 6. Pawn structure (the promotion terms come out of the same pass)
+        pawn_structure, pawn_promotion = _pawn_scores(board.bitboards[WHITE][PAWN],
+                                                      board.bitboards[BLACK][PAWN])
+        score += pawn_structure
         
         # 7. Endgame factors
         if is_endgame:
-            score += self._evaluate_endgame_factors(board)
+            score += self._evaluate_endgame_factors(board, pawn_promotion)
         
         return score
     
-    def _count_total_pieces(self, board: ChessBoard) -> int:
-        """Count total pieces on the board"""
-        count = 0
-        for row in range(8):
-            for col in range(8):
-                if board.board[row][col]:
-                    count += 1
-        return count
-    
     def _evaluate_material_and_position(self, board: ChessBoard, is_endgame: bool) -> int:
         """Evaluate material balance with positional bonuses"""
         score = 0
-        
-        for row in range(8):
-            for col in range(8):
-                piece = board.board[row][col]
-                if piece:
-                    # Material value
-                    material_value = self.piece_values[piece.type]
-                    if piece.color == Color.WHITE:
-                        score += material_value
-                    else:
-                        score -= material_value
-                    
-                    # Positional bonus
-                    positional_bonus = self._get_positional_bonus(piece, row, col, is_endgame)
-                    if piece.color == Color.WHITE:
-                        score += positional_bonus
-                    else:
-                        score -= positional_bonus
+        tables = SQUARE_TABLES[is_endgame]
+        
+        # Walk each piece bitboard instead of scanning all 64 squares
+        for side, sign in ((WHITE, 1), (BLACK, -1)):
+            bitboards = board.bitboards[side]
+            side_tables = tables[side]
+            side_score = 0
+            for kind in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING):
+                bb = bitboards[kind]
+                if not bb:
+                    continue
+                table = side_tables[kind]
+                side_score += PIECE_VALUE[kind] * bb.bit_count()
+                while bb:
+                    lsb = bb & -bb
+                    side_score += table[lsb.bit_length() - 1]
+                    bb ^= lsb
+            score += sign * side_score
         
         return score
     
-    def _get_positional_bonus(self, piece, row: int, col: int, is_endgame: bool) -> int:
-        """Get positional bonus for a piece"""
-        if piece.type == PieceType.KING:
-            table = self.king_endgame_table if is_endgame else self.king_middlegame_table
-        else:
-            table = self.piece_tables.get(piece.type)
-        
-        if not table:
-            return 0
-        
-        # Flip table for black pieces
-        if piece.color == Color.BLACK:
-            return table[row][col]
-        else:
-            return table[7 - row][col]
-    
     def _evaluate_threats(self, board: ChessBoard) -> int:
         """Evaluate piece threats and hanging pieces"""
         score = 0
         
-        for row in range(8):
-            for col in range(8):
-                piece = board.board[row][col]
-                if piece:
-                    attackers = self._get_attackers(board, row, col, 
-                                                  Color.BLACK if piece.color == Color.WHITE else Color.WHITE)
-                    defenders = self._get_attackers(board, row, col, piece.color)
-                    
-                    if attackers and len(attackers) > len(defenders):
-                        # Piece is hanging or under-defended
-                        threat_value = self.piece_values[piece.type] // 10
-                        if piece.color == Color.WHITE:
-                            score -= threat_value
-                        else:
-                            score += threat_value
+        for side, sign in ((WHITE, -1), (BLACK, 1)):
+            pieces = board.occupied[side]
+            while pieces:
+                sq = (pieces & -pieces).bit_length() - 1
+                pieces &= pieces - 1
+                attackers = board.attackers_to(sq, side ^ 1)
+                if attackers and attackers.bit_count() > board.attackers_to(sq, side).bit_count():
+                    # Piece is hanging or under-defended
+                    score += sign * (PIECE_VALUE[abs(board.squares[sq])] // 10)
         
         return score
     
     def _get_attackers(self, board: ChessBoard, target_row: int, target_col: int, attacking_color: Color) -> list:
         """Get all pieces of attacking_color that can attack the target square"""
         attackers = []
-        
-        for row in range(8):
-            for col in range(8):
-                piece = board.board[row][col]
-                if piece and piece.color == attacking_color:
-                    raw_moves = board._get_raw_piece_moves(row, col)
-                    if (target_row, target_col) in raw_moves:
-                        attackers.append((row, col, piece))
+        bb = board.attackers_to(target_row * 8 + target_col, COLOR_INDEX[attacking_color])
+        while bb:
+            sq = (bb & -bb).bit_length() - 1
+            bb &= bb - 1
+            attackers.append((sq >> 3, sq & 7, board.board[sq]))
         
         return attackers
     
@@ -246,29 +302,18 @@ class ChessEvaluator:
         black_developed = 0
         
         for col in [1, 2, 5, 6]:  # Knight and bishop starting squares
-            if not board.board[7][col] or board.board[7][col].has_moved:
+            if not board.board[56 + col] or board.board[56 + col].has_moved:
                 white_developed += 1
-            if not board.board[0][col] or board.board[0][col].has_moved:
+            if not board.board[col] or board.board[col].has_moved:
                 black_developed += 1
         
         score += (white_developed - black_developed) * 30
         
         # Center control
-        center_squares = [(3, 3), (3, 4), (4, 3), (4, 4)]
-        extended_center = [(2, 2), (2, 3), (2, 4), (2, 5), (3, 2), (3, 5), 
-                          (4, 2), (4, 5), (5, 2), (5, 3), (5, 4), (5, 5)]
-        
-        for row, col in center_squares:
-            piece = board.board[row][col]
-            if piece:
-                bonus = 40 if piece.color == Color.WHITE else -40
-                score += bonus
-        
-        for row, col in extended_center:
-            piece = board.board[row][col]
-            if piece:
-                bonus = 20 if piece.color == Color.WHITE else -20
-                score += bonus
+        white, black = board.occupied
+        score += 40 * ((white & CENTER_MASK).bit_count() - (black & CENTER_MASK).bit_count())
+        score += 20 * ((white & EXTENDED_CENTER_MASK).bit_count() -
+                       (black & EXTENDED_CENTER_MASK).bit_count())
         
         return score
     
@@ -284,70 +329,20 @@ class ChessEvaluator:
         king_pos = board.kings[color]
         row, col = king_pos
         
-        # Pawn shield bonus
-        direction = -1 if color == Color.WHITE else 1
-        for dc in [-1, 0, 1]:
-            shield_col = col + dc
-            if 0 <= shield_col < 8:
-                shield_row = row + direction
-                if (0 <= shield_row < 8 and 
-                    board.board[shield_row][shield_col] and
-                    board.board[shield_row][shield_col].type == PieceType.PAWN and
-                    board.board[shield_row][shield_col].color == color):
-                    safety += 30
+        # Pawn shield bonus: own pawns on the three squares in front of the king
+        side = COLOR_INDEX[color]
+        shield = KING_SHIELD_MASK[side][row * 8 + col] & board.bitboards[side][PAWN]
+        safety += 30 * shield.bit_count()
         
         # Penalty for exposed king in opening/middlegame
-        total_pieces = self._count_total_pieces(board)
-        if total_pieces > 20:
+        if board.piece_count > 20:
             if 2 <= row <= 5 and 2 <= col <= 5:
                 safety -= 50
         
         return safety
     
-    def _evaluate_pawn_structure(self, board: ChessBoard) -> int:
-        """Evaluate pawn structure"""
-        score = 0
-        
-        for col in range(8):
-            white_pawns = []
-            black_pawns = []
-            
-            # Collect pawns in this file
-            for row in range(8):
-                piece = board.board[row][col]
-                if piece and piece.type == PieceType.PAWN:
-                    if piece.color == Color.WHITE:
-                        white_pawns.append(row)
-                    else:
-                        black_pawns.append(row)
-            
-            # Doubled pawns penalty
-            if len(white_pawns) > 1:
-                score -= 20 * (len(white_pawns) - 1)
-            if len(black_pawns) > 1:
-                score += 20 * (len(black_pawns) - 1)
-            
-            # Isolated pawns penalty
-            if white_pawns and self._is_isolated_pawn(board, col, Color.WHITE):
-                score -= 15
-            if black_pawns and self._is_isolated_pawn(board, col, Color.BLACK):
-                score += 15
-        
-        return score
-    
-    def _is_isolated_pawn(self, board: ChessBoard, col: int, color: Color) -> bool:
-        """Check if pawns in this file are isolated"""
-        for check_col in [col - 1, col + 1]:
-            if 0 <= check_col < 8:
-                for row in range(8):
-                    piece = board.board[row][check_col]
-                    if (piece and piece.type == PieceType.PAWN and 
-                        piece.color == color):
-                        return False
-        return True
-    
-    def _evaluate_endgame_factors(self, board: ChessBoard) -> int:
-        """Evaluate endgame-specific factors"""
+    def _evaluate_endgame_factors(self, board: ChessBoard, pawn_promotion: int) -> int:
+        """Evaluate endgame-specific factors, given the pawn promotion score"""
         score = 0
         
         # King activity
@@ -368,90 +363,57 @@ class ChessEvaluator:
                 score -= 20
         
         # Pawn promotion evaluation
-        score += self._evaluate_pawn_promotion(board)
-        
-        return score
-    
-    def _evaluate_pawn_promotion(self, board: ChessBoard) -> int:
-        """Evaluate pawn promotion potential"""
-        score = 0
-        
-        for row in range(8):
-            for col in range(8):
-                piece = board.board[row][col]
-                if piece and piece.type == PieceType.PAWN:
-                    if piece.color == Color.WHITE:
-                        promotion_distance = row
-                        score += (7 - promotion_distance) * 15
-                        
-                        # Passed pawn bonus
-                        if self._is_passed_pawn(board, row, col, Color.WHITE):
-                            score += 50 + (7 - promotion_distance) * 20
-                    else:
-                        promotion_distance = 7 - row
-                        score -= (7 - promotion_distance) * 15
-                        
-                        # Passed pawn bonus
-                        if self._is_passed_pawn(board, row, col, Color.BLACK):
-                            score -= 50 + (7 - promotion_distance) * 20
+        score += pawn_promotion
         
         return score
     
-    def _is_passed_pawn(self, board: ChessBoard, row: int, col: int, color: Color) -> bool:
-        """Check if a pawn is passed"""
-        if color == Color.WHITE:
-            for check_row in range(row):
-                for check_col in [col - 1, col, col + 1]:
-                    if (0 <= check_col < 8 and 
-                        board.board[check_row][check_col] and
-                        board.board[check_row][check_col].type == PieceType.PAWN and
-                        board.board[check_row][check_col].color == Color.BLACK):
-                        return False
-        else:
-            for check_row in range(row + 1, 8):
-                for check_col in [col - 1, col, col + 1]:
-                    if (0 <= check_col < 8 and 
-                        board.board[check_row][check_col] and
-                        board.board[check_row][check_col].type == PieceType.PAWN and
-                        board.board[check_row][check_col].color == Color.WHITE):
-                        return False
-        return True
-    
     def get_move_priority(self, board: ChessBoard, move: tuple) -> int:
         """Get priority score for a move"""
         score = 0
         from_row, from_col, to_row, to_col = move[:4]
-        piece = board.board[from_row][from_col]
-        target = board.board[to_row][to_col]
+        target = board.board[to_row * 8 + to_col]
         
         # Prioritize captures
         if target:
-            piece_values = {
-                PieceType.QUEEN: 9, PieceType.ROOK: 5, PieceType.BISHOP: 3,
-                PieceType.KNIGHT: 3, PieceType.PAWN: 1, PieceType.KING: 0
-            }
-            score += 10 + piece_values.get(target.type, 0)
+            score += 10 + CAPTURE_VALUES[target.kind]
         
         # Prioritize promotions
         if len(move) > 4 and move[4] == 'promotion':
             score += 20
         
         # Prioritize checks
-        temp_board = board.copy()
-        try:
-            if len(move) > 4:
-                temp_board.make_move(from_row, from_col, to_row, to_col, move[4])
-            else:
-                temp_board.make_move(from_row, from_col, to_row, to_col)
-            
-            opponent = Color.BLACK if board.current_player == Color.WHITE else Color.WHITE
-            if temp_board.is_in_check(opponent):
-                score += 15
-        except Exception:
-            pass
+        if board.gives_check(from_row, from_col, to_row, to_col):
+            score += 15
         
         # Center control bonus
-        if (to_row, to_col) in [(3, 3), (3, 4), (4, 3), (4, 4)]:
+        if (1 << (to_row * 8 + to_col)) & CENTER_MASK:
             score += 2
         
         return score
+    
+    def _fast_move_priority(self, board: ChessBoard, move: tuple) -> int:
+        """get_move_priority on integer piece codes, with an MVV/LVA tie-break
+        
+        The get_move_priority score is scaled by 8 so captures of the same
+        victim can be ordered by the cheaper attacker first.
+        """
+        from_row, from_col, to_row, to_col = move[:4]
+        squares = board.squares
+        victim = abs(squares[to_row * 8 + to_col])
+        score = 10 + CAPTURE_VALUES[victim] if victim else 0
+        if len(move) > 4 and move[4] == 'promotion':
+            score += 20
+        if board.gives_check(from_row, from_col, to_row, to_col):
+            score += 15
+        if (1 << (to_row * 8 + to_col)) & CENTER_MASK:
+            score += 2
+        score <<= 3
+        if victim:
+            score += KING - abs(squares[from_row * 8 + from_col])
+        return score
+    
+    def order_moves(self, board: ChessBoard, moves: List[tuple]) -> List[tuple]:
+        """Moves sorted by priority, highest first; each key is computed once"""
+        keyed = [(self._fast_move_priority(board, move), move) for move in moves]
+        keyed.sort(key=itemgetter(0), reverse=True)
+        return [move for _, move in keyed]
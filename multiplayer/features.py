@@ -1,15 +1,41 @@
 """
 Multiplayer features: invitations and WebSocket management.
 """
+import asyncio
 import json
 import random
+import secrets
 import string
 import time
 from collections import defaultdict
 from threading import Lock
-from typing import Dict, Set, Optional
+from typing import Dict, List, Set, Optional
 from fastapi import WebSocket
 
+# orjson encodes game states several times faster than the stdlib encoder;
+# without it frames fall back to json.dumps
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Seconds game events wait so that ones arriving together share one frame
+BROADCAST_DELAY = 0.03
+# Sends awaited together before a broadcast yields to other coroutines
+BROADCAST_CHUNK = 50
+
+
+def dumps_message(message: dict) -> bytes:
+    """Encode a WebSocket message as UTF-8 JSON, sent as a binary frame
+    
+    Broadcasts encode once and hand every client the same bytes; the
+    frontend decodes the frames with a TextDecoder before JSON.parse.
+    """
+    if orjson is not None:
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+    # No spaces after separators, matching orjson's compact output
+    return json.dumps(message, separators=(',', ':')).encode()
+
 
 class InvitationManager:
     """Manages invitation codes for Human vs Human games"""
@@ -21,7 +47,6 @@ class InvitationManager:
     
     def create_invitation(self, host_name: str = "Player 1", use_rl_engine: bool = False) -> object:
         """Create a new invitation code and return invitation object"""
-        import uuid
         from datetime import datetime, timedelta
         
         with self.invitation_lock:
@@ -44,7 +69,7 @@ class InvitationManager:
             invitation = Invitation(code, host_name, use_rl_engine)
             
             self.invitations[code] = {
-                'host_session_id': str(uuid.uuid4()),
+                'host_session_id': secrets.token_hex(16),
                 'host_player_name': host_name,
                 'guest_session_id': None,
                 'guest_player_name': None,
@@ -98,8 +123,7 @@ class InvitationManager:
         result = self.join_game(invitation_code, "", player_name)
         if result["success"]:
             # Return a new session ID for the joined game
-            import uuid
-            return str(uuid.uuid4())
+            return secrets.token_hex(16)
         else:
             raise ValueError(result["message"])
     
@@ -151,6 +175,10 @@ class WebSocketManager:
         self.connections: Dict[str, Set[WebSocket]] = defaultdict(set)
         self.websocket_to_session: Dict[WebSocket, str] = {}
         self.connection_lock = Lock()
+        # Events queued by enqueue, per session, until the next flush
+        self.pending: Dict[str, List[dict]] = {}
+        # Scheduled flushes, referenced so they are not garbage collected
+        self._flush_tasks: Set[asyncio.Task] = set()
     
     async def connect(self, websocket: WebSocket, session_id: str):
         """Add a WebSocket connection for a session"""
@@ -172,24 +200,64 @@ class WebSocketManager:
             print(f"❌ WebSocket disconnected for session {session_id[:8]}...")
     
     async def broadcast_to_session(self, session_id: str, message: dict):
-        """Send a message to all connections for a session"""
+        """Send a message to all connections for a session
+        
+        Sends go out concurrently, BROADCAST_CHUNK at a time; between chunks
+        the loop is handed back so a crowd of spectators cannot hold up other
+        requests.
+        """
         if session_id not in self.connections:
             return
         
-        disconnected = []
-        message_json = json.dumps(message)
+        payload = dumps_message(message)
+        websockets = list(self.connections[session_id])
         
-        for websocket in self.connections[session_id].copy():
-            try:
-                await websocket.send_text(message_json)
-            except Exception as e:
-                print(f"⚠️ Failed to send message to WebSocket: {e}")
-                disconnected.append(websocket)
+        disconnected = []
+        for start in range(0, len(websockets), BROADCAST_CHUNK):
+            if start:
+                await asyncio.sleep(0)
+            chunk = websockets[start:start + BROADCAST_CHUNK]
+            results = await asyncio.gather(*(websocket.send_bytes(payload) for websocket in chunk),
+                                           return_exceptions=True)
+            for websocket, result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    print(f"⚠️ Failed to send message to WebSocket: {result}")
+                    disconnected.append(websocket)
         
         # Clean up disconnected sockets
         for ws in disconnected:
             self.disconnect(ws)
     
+    def enqueue(self, session_id: str, message: dict):
+        """Queue a message for the session's connections, sent within BROADCAST_DELAY
+        
+        Messages queued before the flush go out as one frame: on their own if
+        there is just one, otherwise as {"type": "batch", "events": [...]}.
+        Must be called from the event loop.
+        """
+        if session_id not in self.connections:
+            return
+        
+        if session_id in self.pending:
+            self.pending[session_id].append(message)
+            return
+        
+        self.pending[session_id] = [message]
+        task = asyncio.get_running_loop().create_task(self._flush_later(session_id))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush_later(self, session_id: str):
+        """Send the messages queued for a session after BROADCAST_DELAY"""
+        await asyncio.sleep(BROADCAST_DELAY)
+        events = self.pending.pop(session_id, None)
+        if not events:
+            return
+        if len(events) == 1:
+            await self.broadcast_to_session(session_id, events[0])
+        else:
+            await self.broadcast_to_session(session_id, {"type": "batch", "events": events})
+    
     async def broadcast_to_game(self, session_id: str, message: dict):
         """Alias for broadcast_to_session for compatibility"""
         await self.broadcast_to_session(session_id, message)
@@ -1,24 +1,37 @@
 """
 Game session management for chess games.
 """
+import asyncio
+import os
+import secrets
 import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-from typing import Dict, Optional, Set
+from typing import Dict, List, Optional, Set
 from threading import Lock
 from models.chess_board import ChessBoard, Color, GameMode, GameResult
-from engines.mcts import ChessMCTS
+from engines.mcts import ChessMCTS, pool_context, search_fen
 from engines.rl_mcts import RLEnhancedMCTS
 
+# A request that cannot get an AI search slot this quickly is turned away
+# rather than queueing behind the other searches
+SEARCH_SLOT_TIMEOUT = 0.1
 
 
+class SearchBusyError(Exception):
+    """Raised when no AI search slot comes free within SEARCH_SLOT_TIMEOUT"""
+
 
 class GameSession:
     """Represents a single chess game session with independent state"""
     
-    def __init__(self, session_id: str, mode: GameMode = GameMode.HUMAN_VS_AI):
+    def __init__(self, session_id: str, mode: GameMode = GameMode.HUMAN_VS_AI,
+                 manager: Optional['SessionManager'] = None):
         self.session_id = session_id
         self.mode = mode
+        # Owning manager, whose MCTS engine (and transposition table) is shared
+        self.manager = manager
         self.board = ChessBoard()
         self.created_at = time.time()
         self.last_activity = time.time()
@@ -32,10 +45,26 @@ class GameSession:
         self.use_rl_engine = False
         self.game_recorder_id = None
         self.opponent_session_id = None
+        # Held by the API while it changes this session's board, so requests
+        # for one game take turns while other games proceed concurrently
+        self.lock = asyncio.Lock()
+        # Last to_dict result and the state it was built from
+        self._state_cache = None
+        self._state_key = None
+        # (position key, task) of an AI search started right after the
+        # human's move, see start_ai_precompute
+        self._pending_ai_move = None
+        # Statistics of the AI's last search below the move it chose, for the
+        # next search to continue (see ChessMCTS.search_tree)
+        self.mcts_root = None
     
     @property
     def mcts_engine(self):
-        """Lazy initialization of MCTS engine"""
+        """Lazy initialization of MCTS engine
+        
+        The RL engine keeps per-game recording state, so each session has its
+        own; the plain engine is shared through the session's manager.
+        """
         if self.use_rl_engine:
             if self._rl_mcts_engine is None:
                 self._rl_mcts_engine = RLEnhancedMCTS(
@@ -47,6 +76,8 @@ class GameSession:
                 )
             return self._rl_mcts_engine
         else:
+            if self.manager is not None:
+                return self.manager.mcts_engine
             if self._mcts_engine is None:
                 self._mcts_engine = ChessMCTS(
                     time_limit=6.0,
@@ -58,6 +89,11 @@ class GameSession:
     def enable_rl_enhancement(self, use_rl: bool = True):
         """Enable or disable RL-enhanced MCTS"""
         self.use_rl_engine = use_rl
+        if self.manager is not None:
+            if use_rl:
+                self.manager.rl_sessions.add(self.session_id)
+            else:
+                self.manager.rl_sessions.discard(self.session_id)
         if use_rl and self.game_recorder_id is None:
             # Start recording for RL training
             if hasattr(self.mcts_engine, 'start_game_recording'):
@@ -88,7 +124,7 @@ class GameSession:
                   special_move_type=None, promotion_piece=None) -> bool:
         """Make a move in the game"""
         self.update_activity()
-        success = self.board.make_move(
+        success = self.board.try_make_move(
             from_row, from_col, to_row, to_col, 
             special_move_type, promotion_piece
         )
@@ -97,6 +133,13 @@ class GameSession:
         if success and self.use_rl_engine and hasattr(self.mcts_engine, 'move_number'):
             self.mcts_engine.move_number += 1
         
+        if success:
+            # Build the new state now, in the caller's (often a worker) thread.
+            # Its single legal-move generation also settles checkmate and
+            # stalemate, so the get_game_result and to_dict calls that follow
+            # a move are cache lookups.
+            self.to_dict()
+        
         return success
     
     def get_ai_move(self) -> Optional[Dict]:
@@ -125,9 +168,138 @@ class GameSession:
         
         return None
     
+    def _ai_position_key(self):
+        """Identifies the position and engine an AI search was run for"""
+        return (self.board, self.board.zobrist, len(self.board.move_history), self.use_rl_engine)
+    
+    def _submit_search(self, loop: asyncio.AbstractEventLoop):
+        """Submit a search for the AI's move in the current position
+        
+        The future resolves to the move and the search statistics to keep in
+        mcts_root.  Plain-engine searches run in the manager's worker
+        processes, from the position's FEN and repetition history plus the
+        kept statistics for it, so several sessions can think at once instead
+        of taking turns on the GIL; a concurrent future is returned.  The RL
+        engine keeps per-game state in this process, so it searches in a
+        worker thread, as does a session without a manager; get_ai_move also
+        reports why there is no AI move to make.
+        """
+        if (self.use_rl_engine or self.mode != GameMode.HUMAN_VS_AI
+                or self.board.current_player != Color.BLACK):
+            return loop.run_in_executor(None, lambda: (self.get_ai_move(), None))
+        self.update_activity()
+        engine = self.mcts_engine
+        tree = self.mcts_root.get(self.board.zobrist) if self.mcts_root else None
+        if self.manager is None:
+            return loop.run_in_executor(None, engine.search_tree, self.board.copy(), tree)
+        return self.manager.search_pool.submit(search_fen, self.board.to_fen(),
+                                               self.board.repetition_history(), tree,
+                                               engine.time_limit, engine.max_simulations,
+                                               engine.max_depth)
+    
+    async def _start_search(self, precompute: bool = False):
+        """Start a search for the AI's move, holding a search slot until it finishes
+        
+        The manager's slot is taken before the search is submitted and given
+        back by the future's done-callback, so searches still queued in the
+        pool, and precomputes nobody has asked for yet, count against the
+        limit.  A request waits up to SEARCH_SLOT_TIMEOUT for a slot and then
+        raises SearchBusyError; a precompute only starts if a slot is free
+        right away, and returns None otherwise.  Must be called from the
+        event loop.
+        """
+        loop = asyncio.get_running_loop()
+        slots = self.manager.search_slots if self.manager is not None else None
+        if slots is None:
+            return self._submit_search(loop)
+        if precompute:
+            if slots.locked():
+                return None
+            await slots.acquire()
+        else:
+            try:
+                await asyncio.wait_for(slots.acquire(), timeout=SEARCH_SLOT_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise SearchBusyError("Server busy") from None
+        try:
+            search = self._submit_search(loop)
+        except BaseException:
+            slots.release()
+            raise
+        if isinstance(search, asyncio.Future):
+            search.add_done_callback(lambda f: slots.release())
+        else:
+            # Pool futures finish in the executor's management thread
+            search.add_done_callback(
+                lambda f: loop.is_closed() or loop.call_soon_threadsafe(slots.release))
+        return search
+    
+    async def start_ai_precompute(self):
+        """Start searching for the AI's reply in the background
+        
+        Called from the event loop right after the human's move, so the search
+        overlaps the time until the client asks for the AI move.  Only the
+        shared plain engine is used; the RL engine records every search it
+        runs.  Nothing is started while every search slot is taken.
+        """
+        if (self.mode != GameMode.HUMAN_VS_AI or self.board.current_player != Color.BLACK
+                or self.use_rl_engine or not self.board.has_any_legal_move()):
+            return
+        key = self._ai_position_key()
+        if self._pending_ai_move is not None:
+            if self._pending_ai_move[0] == key:
+                return  # Already searching this position
+            self._cancel_ai_precompute()
+        search = await self._start_search(precompute=True)
+        if search is None:
+            return
+        # Mark a failure as seen; next_ai_move falls back to a fresh search
+        search.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending_ai_move = (key, search)
+    
+    def _cancel_ai_precompute(self):
+        """Drop the precomputed search
+        
+        One still queued in the pool is cancelled and gives its slot back at
+        once; one already running cannot be stopped and keeps its slot until
+        it finishes, its result unused.
+        """
+        pending, self._pending_ai_move = self._pending_ai_move, None
+        if pending is not None:
+            pending[1].cancel()
+    
+    async def next_ai_move(self):
+        """The AI's move, taken from the precomputed search when it still applies
+        
+        Awaiting a precompute needs no further search slot: it took one when
+        it was started.  Raises SearchBusyError when a new search finds no
+        slot free.
+        """
+        pending = self._pending_ai_move
+        if pending is not None and pending[0] != self._ai_position_key():
+            self._cancel_ai_precompute()
+            pending = None
+        self._pending_ai_move = None
+        if pending is not None:
+            try:
+                ai_move, kept = await asyncio.wrap_future(pending[1])
+            except Exception as e:
+                print(f"⚠️ Precomputed AI search failed: {e}")
+            else:
+                if ai_move:
+                    print(f"⚡ Using precomputed AI move: {ai_move}")
+                    self.update_activity()
+                    self.mcts_root = kept
+                    return ai_move
+        
+        ai_move, self.mcts_root = await asyncio.wrap_future(await self._start_search())
+        return ai_move
+    
     def reset_game(self):
         """Reset the game session"""
         self.board = ChessBoard()
+        self._cancel_ai_precompute()
+        self.mcts_root = None
         self.update_activity()
         self.game_started = False
         
@@ -145,27 +317,38 @@ class GameSession:
         return self.to_dict()
     
     def to_dict(self) -> Dict:
-        """Convert session to dictionary for JSON serialization"""
-        board_data = self.board.to_dict()
+        """Convert session to dictionary for JSON serialization
         
-        # Add legal moves to the response
-        legal_moves = self.board.get_all_legal_moves()
-        board_data['legal_moves'] = legal_moves
+        The dict is only rebuilt when the board or one of the session fields
+        in it has changed since the last call; last_activity, which every
+        request touches, is filled in fresh each time.
+        """
+        key = (self.board, self.board.zobrist, len(self.board.move_history), self.mode,
+               self.player_white, self.player_black, self.game_started, self.invitation_code,
+               len(self.connected_players), self.use_rl_engine, self.opponent_session_id)
+        if key != self._state_key:
+            # Board state plus legal moves, from a single move generation
+            board_data = self.board.to_dict(include_legal_moves=True)
+            
+            self._state_cache = {
+                **board_data,
+                'session_id': self.session_id,
+                'mode': self.mode.value,
+                'created_at': self.created_at,
+                'last_activity': self.last_activity,
+                'player_white': self.player_white,
+                'player_black': self.player_black,
+                'game_started': self.game_started,
+                'invitation_code': self.invitation_code,
+                'connected_players': len(self.connected_players),
+                'use_rl_engine': self.use_rl_engine,
+                'opponent_session_id': self.opponent_session_id
+            }
+            self._state_key = key
         
-        return {
-            **board_data,
-            'session_id': self.session_id,
-            'mode': self.mode.value,
-            'created_at': self.created_at,
-            'last_activity': self.last_activity,
-            'player_white': self.player_white,
-            'player_black': self.player_black,
-            'game_started': self.game_started,
-            'invitation_code': self.invitation_code,
-            'connected_players': len(self.connected_players),
-            'use_rl_engine': self.use_rl_engine,
-            'opponent_session_id': self.opponent_session_id
-        }
+        state = dict(self._state_cache)
+        state['last_activity'] = self.last_activity
+        return state
 
 
 class SessionManager:
@@ -177,75 +360,154 @@ class SessionManager:
         self.cleanup_interval = 1800  # 30 minutes
         self.last_cleanup = time.time()
         self.max_sessions = 1000
+        self._mcts_engine = None
+        self._search_pool = None
+        # At most one AI search per core is running or waiting in the search
+        # pool, see GameSession._start_search
+        self.search_slots = asyncio.Semaphore(os.cpu_count() or 4)
+        # IDs of the sessions using the RL engine
+        self.rl_sessions: Set[str] = set()
+    
+    @property
+    def mcts_engine(self) -> ChessMCTS:
+        """MCTS engine shared by all sessions, created on first use
+        
+        Searches keep their tree local, so sessions can share one engine and
+        its Zobrist-keyed transposition table.
+        """
+        if self._mcts_engine is None:
+            self._mcts_engine = ChessMCTS(
+                time_limit=6.0,
+                max_simulations=3000,
+                max_depth=40
+            )
+        return self._mcts_engine
+    
+    def start_search_pool(self):
+        """Start the worker processes for AI searches, if not running yet
+        
+        The app calls this at startup; workers are started as pool_context
+        describes.  Any worker can take any search: the tree a game's
+        search continues from travels with the job (see mcts_root).
+        """
+        if self._search_pool is None:
+            self._search_pool = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                                    mp_context=pool_context())
+    
+    @property
+    def search_pool(self) -> ProcessPoolExecutor:
+        """Worker processes for AI searches with the shared engine's settings
+        
+        Started by start_search_pool, or here when used outside the app.
+        """
+        self.start_search_pool()
+        return self._search_pool
+    
+    def close(self):
+        """Shut down the AI search worker processes"""
+        if self._search_pool is not None:
+            self._search_pool.shutdown(wait=False, cancel_futures=True)
+            self._search_pool = None
     
     def create_session(self, mode: GameMode = GameMode.HUMAN_VS_AI, 
                       use_rl: bool = False) -> str:
         """Create a new game session"""
+        # Cleanup before creating new sessions (it takes session_lock itself)
+        self.cleanup_expired_sessions()
+        
+        # Prevent too many sessions
+        if len(self.sessions) >= self.max_sessions:
+            self.cleanup_expired_sessions(force=True)
+        
         with self.session_lock:
-            # Cleanup before creating new sessions
-            self.cleanup_expired_sessions()
-            
-            # Prevent too many sessions
-            if len(self.sessions) >= self.max_sessions:
-                self.cleanup_expired_sessions(force=True)
-            
-            session_id = str(uuid.uuid4())
+            return self._add_session(None, mode, use_rl).session_id
+    
+    def _add_session(self, session_id: Optional[str], mode: GameMode,
+                     use_rl: bool) -> GameSession:
+        """Register a new session; the caller holds session_lock
+        
+        A fresh id is drawn when session_id is None.
+        """
+        if session_id is None:
+            session_id = secrets.token_hex(16)
             while session_id in self.sessions:
-                session_id = str(uuid.uuid4())
-            
-            session = GameSession(session_id, mode)
-            if use_rl:
-                session.enable_rl_enhancement(True)
-            
-            self.sessions[session_id] = session
-            print(f"🎯 Created new session: {session_id[:8]}... (Mode: {mode.value}, RL: {use_rl})")
-            return session_id
+                session_id = secrets.token_hex(16)
+        
+        session = GameSession(session_id, mode, self)
+        if use_rl:
+            session.enable_rl_enhancement(True)
+        
+        self.sessions[session_id] = session
+        print(f"🎯 Created new session: {session_id[:8]}... (Mode: {mode.value}, RL: {use_rl})")
+        return session
     
     def get_session(self, session_id: str) -> Optional[GameSession]:
-        """Get an existing session"""
-        with self.session_lock:
-            if not session_id or session_id not in self.sessions:
-                return None
-            
-            session = self.sessions[session_id]
+        """Get an existing session
+        
+        Runs on every request, so it does not take session_lock: a single
+        dict lookup is atomic, and a session removed concurrently is simply
+        reported missing.
+        """
+        session = self.sessions.get(session_id) if session_id else None
+        if session is not None:
             session.update_activity()
-            return session
+        return session
     
     def get_or_create_session(self, session_id: str, 
                              mode: GameMode = GameMode.HUMAN_VS_AI) -> GameSession:
-        """Get existing session or create new one"""
-        session = self.get_session(session_id)
-        if session:
-            return session
+        """Get existing session or create new one
+        
+        An unknown but well-formed ID (32 hex digits, dashes as in a UUID
+        allowed) becomes the new session's ID, for WebSocket compatibility;
+        anything else gets a fresh ID.  Lookup and creation happen under one
+        hold of session_lock.
+        """
+        try:
+            session_id = uuid.UUID(session_id.strip()).hex
+        except (AttributeError, ValueError):
+            session_id = None
         
-        # Create new session with the provided ID (for WebSocket compatibility)
         with self.session_lock:
-            session = GameSession(session_id, mode)
-            self.sessions[session_id] = session
+            session = self.sessions.get(session_id) if session_id else None
+            if session is None:
+                session = self._add_session(session_id, mode, False)
+            session.update_activity()
             return session
     
-    def cleanup_expired_sessions(self, force: bool = False):
-        """Clean up expired sessions"""
+    def expired_session_ids(self, force: bool = False) -> List[str]:
+        """IDs of the sessions due for cleanup; none until cleanup_interval has passed
+        
+        Only reads a snapshot of the session table, so it may run in a worker
+        thread.  The sessions are then removed with remove_sessions on the
+        event loop, which reads the table without a lock.
+        """
         current_time = time.time()
         cleanup_threshold = self.cleanup_interval if not force else 0
-        
-        if current_time - self.last_cleanup > cleanup_threshold:
-            with self.session_lock:
-                timeout_hours = 2 if force else 24
-                expired_sessions = [
-                    sid for sid, session in self.sessions.items() 
-                    if session.is_expired(timeout_hours)
-                ]
-                
-                for sid in expired_sessions:
-                    session = self.sessions[sid]
-                    if session.use_rl_engine:
-                        session.finish_game("expired")
-                    del self.sessions[sid]
-                
-                self.last_cleanup = current_time
-                if expired_sessions:
-                    print(f"🧹 Cleaned up {len(expired_sessions)} expired sessions")
+        if current_time - self.last_cleanup <= cleanup_threshold:
+            return []
+        self.last_cleanup = current_time
+        timeout_hours = 2 if force else 24
+        return [sid for sid, session in list(self.sessions.items())
+                if session.is_expired(timeout_hours)]
+    
+    def remove_sessions(self, session_ids: List[str]) -> List[GameSession]:
+        """Remove sessions by ID, returning those that were still registered"""
+        removed = []
+        with self.session_lock:
+            for sid in session_ids:
+                session = self.sessions.pop(sid, None)
+                if session is not None:
+                    removed.append(session)
+                    self.rl_sessions.discard(sid)
+        if removed:
+            print(f"🧹 Cleaned up {len(removed)} expired sessions")
+        return removed
+    
+    def cleanup_expired_sessions(self, force: bool = False):
+        """Clean up expired sessions"""
+        for session in self.remove_sessions(self.expired_session_ids(force)):
+            if session.use_rl_engine:
+                session.finish_game("expired")
     
     def get_session_count(self) -> int:
         """Get total number of sessions"""
@@ -1087,6 +1087,8 @@ setInterval(async () => {
 let socket = null;
 let reconnectAttempts = 0;
 const maxReconnectAttempts = 5;
+// The server sends JSON as binary (UTF-8) frames
+const frameDecoder = new TextDecoder();
 
 function connectWebSocket() {
     if (!sessionId) {
@@ -1106,6 +1108,7 @@ function connectWebSocket() {
         const wsUrl = `${wsProtocol}//${wsHost}/ws/${sessionId}`;
         console.log('Connecting to WebSocket:', wsUrl);
         socket = new WebSocket(wsUrl);
+        socket.binaryType = 'arraybuffer';
         
         socket.onopen = function(event) {
             console.log('🔗 WebSocket connected');
@@ -1115,7 +1118,8 @@ function connectWebSocket() {
         
         socket.onmessage = function(event) {
             try {
-                const data = JSON.parse(event.data);
+                const text = typeof event.data === 'string' ? event.data : frameDecoder.decode(event.data);
+                const data = JSON.parse(text);
                 console.log('📨 WebSocket message received:', data);
                 handleWebSocketMessage(data);
             } catch (error) {
@@ -1150,6 +1154,10 @@ function handleWebSocketMessage(data) {
     console.log('📨 Processing WebSocket message:', data);
     
     switch (data.type) {
+        case 'batch':
+            // Events the server sent together in one frame, in order
+            (data.events || []).forEach(handleWebSocketMessage);
+            break;
         case 'game_update':
             if (data.game_state) {
                 console.log('🔄 Updating game state from WebSocket');
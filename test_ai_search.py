@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for AI searches run from a FEN position in the search worker processes.
+"""
+import asyncio
+from models.chess_board import ChessBoard
+from engines import mcts
+from engines.mcts import search_fen
+from session.game_session import GameSession
+
+# Nf3 Nf6 Ng1 Ng8 Nf3 Nf6 Ng1 Ng8: the start position for the third time
+KNIGHT_SHUFFLE = [(7, 6, 5, 5), (0, 6, 2, 5), (5, 5, 7, 6), (2, 5, 0, 6)] * 2
+
+
+def test_fen_board_keeps_repetitions():
+    board = ChessBoard()
+    for move in KNIGHT_SHUFFLE:
+        assert board.make_move(*move)
+    assert board.is_threefold_repetition()
+    
+    # Without the history the FEN board cannot see the earlier positions
+    assert not ChessBoard.from_fen(board.to_fen()).is_threefold_repetition()
+    rebuilt = ChessBoard.from_fen(board.to_fen(), board.repetition_history())
+    assert rebuilt.is_threefold_repetition()
+    assert rebuilt.repetition_history() == board.repetition_history()
+    print("✅ FEN board with repetition history sees the threefold repetition")
+
+
+def test_fen_board_ignores_foreign_history():
+    board = ChessBoard()
+    board.make_move(6, 4, 4, 4)
+    other = ChessBoard.from_fen(board.to_fen(), ChessBoard().repetition_history())
+    assert other.repetition_history() == (other.zobrist,)
+    print("✅ History from another position is ignored")
+
+
+def test_search_fen_with_history():
+    board = ChessBoard()
+    for move in KNIGHT_SHUFFLE[:-1]:
+        assert board.make_move(*move)
+    move, _ = search_fen(board.to_fen(), board.repetition_history(), None, 0.5, 30, 10)
+    assert move in board.get_all_legal_moves()
+    print(f"✅ search_fen with repetition history returned {move}")
+
+
+def test_search_fen_continues_kept_tree():
+    board = ChessBoard()
+    board.make_move(6, 4, 4, 4)
+    move, kept = search_fen(board.to_fen(), board.repetition_history(), None, 5.0, 300, 20)
+    board.make_move(*move)
+    
+    # The statistics below the chosen move, by the position each reply reaches
+    for reply in board.get_all_legal_moves():
+        after = board.copy()
+        after.make_move(*reply)
+        if after.zobrist in kept and kept[after.zobrist][0] > 0:
+            break
+    else:
+        raise AssertionError("no explored reply was kept")
+    tree = kept[after.zobrist]
+    
+    # The next search starts from that tree, not from scratch
+    fen_board = ChessBoard.from_fen(after.to_fen(), after.repetition_history())
+    root = mcts._search_engine._root_node(fen_board, tree)
+    assert root.visits > 0 and root.visits == round(tree[0] * mcts.TREE_DECAY)
+    assert sorted(child.move for child in root.children) == sorted(tree[2])
+    next_move, _ = search_fen(after.to_fen(), after.repetition_history(), tree, 0.5, 50, 20)
+    assert next_move in after.get_all_legal_moves()
+    print(f"✅ Search after {reply} continues a kept tree of {root.visits} visits")
+
+
+def test_session_keeps_tree_until_reset():
+    session = GameSession("tree-test")
+    session.mcts_engine.time_limit = 5.0
+    session.mcts_engine.max_simulations = 300
+    session.make_move(6, 4, 4, 4)
+    ai_move = asyncio.run(session.next_ai_move())
+    assert ai_move and session.mcts_root
+    session.reset_game()
+    assert session.mcts_root is None
+    print("✅ Session keeps its search tree until the game is reset")
+
+
+if __name__ == "__main__":
+    test_fen_board_keeps_repetitions()
+    test_fen_board_ignores_foreign_history()
+    test_search_fen_with_history()
+    test_search_fen_continues_kept_tree()
+    test_session_keeps_tree_until_reset()
+    print("All AI search tests passed!")
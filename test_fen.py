@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for reading and writing positions as FEN.
+"""
+from models.chess_board import ChessBoard
+
+ROUND_TRIP_FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    # Castling rights partly lost, en passant square after a double push
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w Kq - 3 12",
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    "rnbqkbnr/pppp1ppp/8/8/3Pp3/8/PPP1PPPP/RNBQKBNR b Qk d3 0 2",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+
+def test_fen_round_trip():
+    for fen in ROUND_TRIP_FENS:
+        board = ChessBoard.from_fen(fen)
+        assert board.to_fen() == fen, (board.to_fen(), fen)
+        again = ChessBoard.from_fen(board.to_fen())
+        assert again.to_fen() == fen
+        assert again.zobrist == board.zobrist
+        assert again.castling == board.castling
+        assert again.en_passant_target == board.en_passant_target
+        print(f"✅ {fen}")
+
+
+def test_fen_after_moves():
+    # The castling rights and en passant square the moves leave behind
+    board = ChessBoard()
+    for move in [(6, 4, 4, 4), (1, 0, 3, 0), (7, 6, 5, 5), (0, 0, 1, 0),
+                 (7, 5, 6, 4), (3, 0, 4, 0), (6, 1, 4, 1)]:
+        assert board.make_move(*move)
+    assert board.to_fen() == "1nbqkbnr/rppppppp/8/8/pP2P3/5N2/P1PPBPPP/RNBQK2R b KQk b3 0 4"
+    
+    rebuilt = ChessBoard.from_fen(board.to_fen())
+    assert rebuilt.to_fen() == board.to_fen()
+    assert rebuilt.zobrist == board.zobrist
+    assert rebuilt.castling == board.castling
+    assert rebuilt.en_passant_target == board.en_passant_target == (5, 1)
+    assert sorted(rebuilt.get_all_legal_moves()) == sorted(board.get_all_legal_moves())
+    assert (4, 0, 5, 1) in rebuilt.get_all_legal_moves()  # axb3 en passant
+    print("✅ FEN of a played position round-trips with castling and en passant")
+
+
+def test_castling_rights_need_home_pieces():
+    # Rights claimed for a king or rook off its home square are dropped
+    for fen, expected in [
+        ("4k3/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1"),
+        ("4k3/8/8/8/8/8/8/R4K1R w KQ - 0 1", "4k3/8/8/8/8/8/8/R4K1R w - - 0 1"),
+        ("r3k3/8/8/8/8/8/8/4K2R b KQkq - 0 1", "r3k3/8/8/8/8/8/8/4K2R b Kq - 0 1"),
+        ("4k3/8/8/8/8/8/8/r3K2R w KQ -", "4k3/8/8/8/8/8/8/r3K2R w K - 0 1"),
+    ]:
+        board = ChessBoard.from_fen(fen)
+        assert board.to_fen() == expected, (board.to_fen(), expected)
+        # Move generation only offers castling the position allows
+        board.perft(2)
+        print(f"✅ {fen} -> {expected}")
+
+
+if __name__ == "__main__":
+    test_fen_round_trip()
+    test_fen_after_moves()
+    test_castling_rights_need_home_pieces()
+    print("All FEN tests passed!")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests that make_move and is_pseudo_legal turn away illegal moves and leave
+the board untouched.
+"""
+from models.chess_board import ChessBoard
+
+
+def assert_rejected(board, move, reason):
+    fen = board.to_fen()
+    zobrist = board.zobrist
+    assert move not in board.get_all_legal_moves(), reason
+    assert not board.make_move(*move), reason
+    assert board.to_fen() == fen and board.zobrist == zobrist, reason
+    print(f"✅ Rejected {move}: {reason}")
+
+
+def test_wrong_colour():
+    board = ChessBoard()
+    assert not board.is_pseudo_legal(1, 4, 3, 4)
+    assert_rejected(board, (1, 4, 3, 4), "black pawn moved on white's turn")
+    assert_rejected(board, (0, 6, 2, 5), "black knight moved on white's turn")
+
+
+def test_blocked_slider():
+    board = ChessBoard()
+    assert not board.is_pseudo_legal(7, 0, 5, 0)
+    assert_rejected(board, (7, 0, 5, 0), "rook jumps over its own pawn")
+    assert_rejected(board, (7, 2, 5, 4), "bishop jumps over its own pawn")
+    assert_rejected(board, (7, 3, 3, 7), "queen jumps over its own pawn")
+    
+    board = ChessBoard.from_fen("4k3/8/8/8/r2P3R/8/8/4K3 w - - 0 1")
+    assert not board.is_pseudo_legal(4, 7, 4, 0)
+    assert_rejected(board, (4, 7, 4, 0), "rook captures through a pawn")
+
+
+def test_castling_through_check():
+    # The black rook on f8 covers f1, which the king passes on the kingside
+    board = ChessBoard.from_fen("4kr2/8/8/8/8/8/8/R3K2R w KQ - 0 1")
+    assert_rejected(board, (7, 4, 7, 6), "kingside castling through check")
+    assert board.make_move(7, 4, 7, 2)  # queenside is fine
+    
+    board = ChessBoard.from_fen("4k3/8/8/8/8/8/8/R3K2r w Q - 0 1")
+    assert_rejected(board, (7, 4, 7, 2), "castling out of check")
+
+
+def test_stale_en_passant():
+    board = ChessBoard()
+    for move in [(6, 4, 4, 4), (1, 0, 2, 0), (4, 4, 3, 4), (1, 3, 3, 3)]:
+        assert board.make_move(*move)
+    # exd6 en passant is only available straight after ...d5
+    assert (3, 4, 2, 3) in board.get_all_legal_moves()
+    for move in [(6, 7, 5, 7), (1, 7, 2, 7)]:
+        assert board.make_move(*move)
+    assert board.en_passant_target is None
+    assert not board.is_pseudo_legal(3, 4, 2, 3)
+    assert_rejected(board, (3, 4, 2, 3), "en passant a move too late")
+
+
+if __name__ == "__main__":
+    test_wrong_colour()
+    test_blocked_slider()
+    test_castling_through_check()
+    test_stale_en_passant()
+    print("All move legality tests passed!")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Perft tests: count the leaf nodes of the legal move tree from well-known
+positions and compare them with the published numbers.
+"""
+import time
+from models.chess_board import ChessBoard
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+POSITION_3 = "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"
+POSITION_5 = "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8"
+EN_PASSANT = "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+
+# (name, FEN, {depth: leaf count}); none of these trees reaches a promotion, so the
+# board's queen-only promotions do not change the counts
+PERFT_POSITIONS = [
+    ("startpos", None, {1: 20, 2: 400, 3: 8902, 4: 197281}),
+    ("Kiwipete", KIWIPETE, {1: 48, 2: 2039, 3: 97862}),
+    ("position 3", POSITION_3, {1: 14, 2: 191, 3: 2812, 4: 43238}),
+]
+
+
+def test_perft():
+    for name, fen, counts in PERFT_POSITIONS:
+        board = ChessBoard() if fen is None else ChessBoard.from_fen(fen)
+        for depth, expected in counts.items():
+            start = time.time()
+            nodes = board.perft(depth)
+            assert nodes == expected, f"{name} depth {depth}: {nodes} != {expected}"
+            print(f"✅ {name} perft({depth}) = {nodes} ({time.time() - start:.2f}s)")
+        # Counting makes and unmakes every move, leaving the board unchanged
+        assert board.to_fen() == (fen or ChessBoard().to_fen())
+
+
+
+def board_state(board):
+    """Everything make_move changes and unmake_move must restore"""
+    return (board.zobrist, board.castling, board.en_passant_target, board.halfmove_clock,
+            board.fullmove_number, board.current_player, board.side_to_move,
+            dict(board.kings), list(board.squares), [list(b) for b in board.bitboards],
+            list(board.occupied), list(board.material), list(board._position_history),
+            dict(board._position_counts), len(board.move_history))
+
+
+def test_make_unmake_round_trip():
+    # (position, move, what it exercises)
+    special_moves = [
+        (KIWIPETE, (3, 4, 1, 5), "a capture"),
+        (KIWIPETE, (7, 4, 7, 6), "kingside castling"),
+        (KIWIPETE, (7, 4, 7, 2), "queenside castling"),
+        (EN_PASSANT, (3, 4, 2, 5), "an en passant capture"),
+        (POSITION_5, (1, 3, 0, 2), "a capture promotion"),
+    ]
+    for fen, move, kind in special_moves:
+        board = ChessBoard.from_fen(fen)
+        before = board_state(board)
+        assert board.make_move(*move), kind
+        assert board_state(board) != before
+        assert board.unmake_move()
+        assert board_state(board) == before, kind
+        print(f"✅ unmake_move restores the board after {kind}")
+    
+    # Every move two plies deep, in positions with all of the above
+    for fen in (None, KIWIPETE, POSITION_5, EN_PASSANT):
+        board = ChessBoard() if fen is None else ChessBoard.from_fen(fen)
+        root = board_state(board)
+        for move in board.get_all_legal_moves():
+            assert board.make_move(*move)
+            after = board_state(board)
+            for reply in board.get_all_legal_moves():
+                assert board.make_move(*reply)
+                assert board.unmake_move()
+                assert board_state(board) == after, (fen, move, reply)
+            assert board.unmake_move()
+            assert board_state(board) == root, (fen, move)
+    print("✅ make/unmake round trip two plies deep")
+
+
+if __name__ == "__main__":
+    test_perft()
+    test_make_unmake_round_trip()
+    print("All perft tests passed!")